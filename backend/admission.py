@@ -0,0 +1,158 @@
+import math
+import time
+import threading
+from flask import request, jsonify, g
+
+# JSON bodies larger than this are not parsed just to find a user key
+MAX_KEY_BODY = 64 * 1024
+
+
+class TokenBuckets:
+    """Per-key token buckets refilled at rate tokens/second up to burst."""
+
+    def __init__(self, rate, burst, max_keys=100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = {}      # key -> (tokens, last refill)
+
+    def take(self, key, cost=1.0):
+        """Spend cost tokens; returns 0 if allowed, else seconds until it would be."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= cost
+            self._buckets[key] = (tokens - cost if allowed else tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0 if allowed else (cost - tokens) / self.rate
+
+    def _prune(self, now):
+        # Buckets that have refilled completely are the same as absent ones
+        idle = self.burst / self.rate
+        for key in [k for k, (_, last) in self._buckets.items() if now - last >= idle]:
+            del self._buckets[key]
+        # Still full of active keys: forget the oldest quarter rather than grow
+        if len(self._buckets) > self.max_keys:
+            for key in list(self._buckets)[:len(self._buckets) // 4]:
+                del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class ConcurrencyGate:
+    """Admits up to limit requests at once; up to max_queue more wait, the rest are shed."""
+
+    def __init__(self, limit, max_queue=0, timeout=5.0):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.shed = 0
+
+    def enter(self):
+        with self._cond:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.max_queue:
+                self.shed += 1
+                return False
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + self.timeout
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed += 1
+                        return False
+                    self._cond.wait(remaining)
+                self.active += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def leave(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+class Policy:
+    """Limits for one endpoint: rate/burst per client key, optional concurrency gate."""
+
+    def __init__(self, rate, burst, concurrency=None, queue=0, timeout=5.0):
+        self.buckets = TokenBuckets(rate, burst)
+        self.gate = ConcurrencyGate(concurrency, queue, timeout) if concurrency else None
+        self.rejected = 0
+
+    def stats(self):
+        stats = {'rejected': self.rejected, 'clients': len(self.buckets)}
+        if self.gate:
+            stats.update(active=self.gate.active, waiting=self.gate.waiting, shed=self.gate.shed)
+        return stats
+
+
+def client_keys():
+    """Bucket keys for the current request: always the IP, plus the user when known."""
+    keys = [f'ip:{request.remote_addr}']
+    user = request.args.get('user_id')
+    if not user and request.is_json and (request.content_length or 0) <= MAX_KEY_BODY:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            user = data.get('username') or data.get('user_id') or data.get('creator_id')
+    if user:
+        keys.append(f'user:{user}')
+    return keys
+
+
+class AdmissionControl:
+    """Token-bucket rate limits and load shedding in front of selected endpoints.
+
+    Over-rate clients get an immediate 429 with Retry-After; when an endpoint's
+    concurrency gate and its wait queue are both full the request is shed with
+    503, so bursts cannot pile up threads behind slow handlers.
+    """
+
+    def __init__(self, policies):
+        self.policies = policies    # endpoint name -> Policy
+
+    def init_app(self, app):
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+
+    def _admit(self):
+        policy = self.policies.get(request.endpoint)
+        if policy is None:
+            return None
+
+        for key in client_keys():
+            wait = policy.buckets.take(key)
+            if wait:
+                policy.rejected += 1
+                response = jsonify({'error': 'Too many requests'})
+                response.status_code = 429
+                response.headers['Retry-After'] = str(math.ceil(wait))
+                return response
+
+        if policy.gate:
+            if not policy.gate.enter():
+                response = jsonify({'error': 'Server busy, try again shortly'})
+                response.status_code = 503
+                response.headers['Retry-After'] = '1'
+                return response
+            g.admission_gate = policy.gate
+        return None
+
+    def _release(self, exc=None):
+        gate = g.pop('admission_gate', None)
+        if gate:
+            gate.leave()
+
+    def stats(self):
+        return {endpoint: policy.stats() for endpoint, policy in self.policies.items()}
@@ -1,10 +1,29 @@
 import os
 import uuid
 import json
+import time
+import queue
+import logging
+import logging.handlers
 from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, Response
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
+from catalog import VideoCatalog, CommentStore, EngagementCounters, ReactionMap
+from media import send_video_file, starts_playback
+from uploads import UploadSessions, UploadError
+from journal import Journal
+from probe import ProbeQueue
+from search import SearchIndex
+from views import ViewCounter
+from reclaim import FileReclaimer
+from thumbnails import ThumbnailCache, PosterGenerator, FORMATS as THUMBNAIL_FORMATS
+from chat import ChatRing, ArchiveWriter
+from events import EventHubs, HubFull
+from presence import PresenceTracker
+from response_cache import ResponseCache
+from fragments import FragmentCache, encode, join_array
+from admission import AdmissionControl, Policy
 
 app = Flask(__name__)
 app.secret_key = 'production-video-platform-key'
@@ -12,25 +31,250 @@ CORS(app)
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
+DATA_FOLDER = os.environ.get('DATA_FOLDER', 'data')
 ALLOWED_EXTENSIONS = {'mp4', 'avi', 'mov', 'wmv', 'flv', 'webm', 'mkv'}
 MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB max file size
+MAX_PAGE_SIZE = 100
+COMMENTS_PAGE_SIZE = 20
+CHAT_BUFFER_SIZE = 500     # live chat messages kept in memory per stream
+CHAT_RECENT = 50           # messages embedded in /api/live/<id>
+LIVE_MAX_SUBSCRIBERS = 1000    # event-stream connections per live stream
+PRESENCE_TTL = 30          # seconds a viewer counts as watching after a heartbeat
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 
+# Request logging goes through a queue so handlers never block on stdout
+log_queue = queue.SimpleQueue()
+log = logging.getLogger('platform')
+log.setLevel(logging.INFO)
+log.addHandler(logging.handlers.QueueHandler(log_queue))
+log.propagate = False
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+
+# Admission control: per-client (IP and user) token buckets, and concurrency
+# limits with a bounded wait queue on endpoints that hold a worker for long
+admission = AdmissionControl({
+    'login': Policy(rate=0.5, burst=10),
+    'register': Policy(rate=0.1, burst=5),
+    'add_comment': Policy(rate=1, burst=10),
+    'add_live_chat': Policy(rate=2, burst=10),
+    'upload_video': Policy(rate=0.1, burst=3, concurrency=4, queue=8),
+    'create_upload': Policy(rate=0.2, burst=5),
+    'put_upload_chunk': Policy(rate=20, burst=40, concurrency=16, queue=32)
+})
+admission.init_app(app)
+
 # Create upload directory
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+upload_sessions = UploadSessions(UPLOAD_FOLDER, MAX_CONTENT_LENGTH)
+
 # Storage
 users = {'admin': 'admin123', 'creator1': 'pass123', 'user1': 'user123'}
-videos = []
-comments = []
-likes = []
+videos = VideoCatalog()
+comments = CommentStore()
+counters = EngagementCounters()
+likes = ReactionMap(counters)
 live_streams = {}
+chat_rings = {}     # stream_id -> ChatRing
+chat_archive = ArchiveWriter()
+live_events = EventHubs(LIVE_MAX_SUBSCRIBERS)
+
+# Hot list endpoints; /api/videos is versioned by the catalog and counters,
+# /api/live-streams by the 'live' counter bumped below
+response_cache = ResponseCache()
+video_fragments = FragmentCache()
+search_index = SearchIndex()
+
+journal = Journal(DATA_FOLDER)
+reclaimer = FileReclaimer()
+
+def store_video(video):
+    videos.add(video)
+    search_index.add(video)
+
+def store_comment(comment):
+    comments.add(comment)
+    counters.add(comment['video_id'], 'comments_count')
+
+def remove_comment(comment_id):
+    comment = comments.remove(comment_id)
+    if comment:
+        counters.add(comment['video_id'], 'comments_count', -1)
+    return comment
+
+def remove_video(video_id):
+    # Unpublish at once; related rows go through their per-video indexes and
+    # the (possibly huge) file is unlinked later by the reclaimer
+    video = videos.remove(video_id)
+    if video is None:
+        return None
+    search_index.remove(video_id)
+    video_fragments.discard(video_id)
+    comments.drop_video(video_id)
+    likes.drop_video(video_id)
+    counters.drop(video_id)
+    reclaimer.submit(video.get('filepath'), video.get('file_size'))
+    return video
+
+def open_stream(stream):
+    stream_id = stream['id']
+    live_streams[stream_id] = stream
+    presence.open(stream_id)
+    response_cache.bump('live')
+    if stream_id not in chat_rings:
+        chat_rings[stream_id] = ChatRing(CHAT_BUFFER_SIZE,
+                                         os.path.join(DATA_FOLDER, 'chat', f'{stream_id}.jsonl'),
+                                         chat_archive)
+    return chat_rings[stream_id]
+
+def close_stream(stream_id):
+    stream = live_streams.pop(stream_id, None)
+    ring = chat_rings.pop(stream_id, None)
+    if ring:
+        ring.close()
+    presence.drop(stream_id)
+    live_events.close(stream_id)
+    response_cache.bump('live')
+    return stream
+
+# Persistence: every mutation is journaled; replay must be idempotent (see Journal).
+def apply_op(op, args):
+    if op == 'user_add':
+        users[args[0]] = args[1]
+    elif op == 'video_add':
+        if args[0]['id'] not in videos:
+            store_video(args[0])
+    elif op == 'video_update':
+        videos.update(args[0], args[1])
+    elif op == 'video_delete':
+        remove_video(args[0])
+    elif op == 'comment_add':
+        if args[0]['id'] not in comments:
+            store_comment(args[0])
+    elif op == 'comment_delete':
+        remove_comment(args[0])
+    elif op == 'reaction_set':
+        likes.set(args[0]['video_id'], args[0]['user_id'], args[0])
+    elif op == 'reaction_retract':
+        likes.retract(args[0], args[1])
+    elif op == 'stream_start':
+        if args[0]['id'] not in live_streams:
+            open_stream(args[0])
+    elif op == 'stream_chat':
+        # Messages carry their seq, so ones already in the snapshot are skipped
+        ring = chat_rings.get(args[0])
+        if ring:
+            ring.restore(args[1])
+    elif op == 'stream_stop':
+        close_stream(args[0])
+
+def capture_state():
+    return {
+        'users': dict(users),
+        'videos': [dict(v) for v in videos],
+        'comments': comments.values(),
+        'likes': likes.values(),
+        'live_streams': {k: dict(s) for k, s in list(live_streams.items())},
+        'live_chat': {k: ring.since(0)[0] for k, ring in list(chat_rings.items())}
+    }
+
+def restore_state():
+    started = time.time()
+    state, ops = journal.load()
+    if state:
+        users.update(state['users'])
+        for video in state['videos']:
+            store_video(video)
+        for comment in state['comments']:
+            store_comment(comment)
+        for reaction in state['likes']:
+            likes.set(reaction['video_id'], reaction['user_id'], reaction)
+        for stream_id, stream in state['live_streams'].items():
+            ring = open_stream(stream)
+            for message in state.get('live_chat', {}).get(stream_id, []):
+                ring.restore(message)
+    
+    replayed = 0
+    for op, args in ops:
+        apply_op(op, args)
+        replayed += 1
+    
+    print(f"Restored {len(videos)} videos, {len(likes)} likes, {replayed} journal ops "
+          f"in {time.time() - started:.2f}s")
+    journal.start(capture_state)
+
+def on_probe_result(video_id, info):
+    fields = {key: info[key] for key in ('duration', 'duration_seconds', 'width', 'height', 'bitrate') if key in info}
+    if videos.update(video_id, fields):
+        journal.record('video_update', video_id, fields)
+
+probe_queue = ProbeQueue(on_probe_result)
+
+def on_poster_ready(video_id, digests):
+    fields = {'poster': digests}
+    if 'jpg' in digests:
+        # Content-addressed URL, so browsers may cache it forever
+        fields['thumbnail'] = f"/api/thumbnails/{digests['jpg']}.jpg"
+    if videos.update(video_id, fields):
+        journal.record('video_update', video_id, fields)
+
+thumbnail_cache = ThumbnailCache(os.path.join(DATA_FOLDER, 'thumbnails'))
+poster_generator = PosterGenerator(thumbnail_cache, on_poster_ready)
+
+def on_views_flushed(deltas):
+    # Only the flusher thread writes 'views', so this read-modify-write is safe
+    for video_id, count in deltas.items():
+        video = videos.get(video_id)
+        if video:
+            fields = {'views': video.get('views', 0) + count}
+            videos.update(video_id, fields)
+            journal.record('video_update', video_id, fields)
+
+view_counter = ViewCounter(on_views_flushed)
+view_counter.start()
+
+def on_presence_changed(stream_id, counts):
+    response_cache.bump('live')
+    live_events.publish(stream_id, 'viewers', counts)
+
+presence = PresenceTracker(on_presence_changed, ttl=PRESENCE_TTL)
+presence.start()
+
+def video_file_path(video):
+    return os.path.join(app.root_path, app.config['UPLOAD_FOLDER'], video['filename'])
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def videos_version():
+    return (videos.version, counters.version)
+
+def video_json(video, fields=None):
+    # Cached encoding of the listing view of one video, stamped by its revisions
+    video_id = video['id']
+    stamp = (videos.revision(video_id), counters.revision(video_id))
+    return video_fragments.get(video_id, stamp,
+                               lambda: project({**video, **counters.get(video_id)}, fields),
+                               tuple(fields) if fields else None)
+
+def requested_fields():
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return ['id'] + [f for f in fields.split(',') if f and f != 'id']
+
+def project(video, fields):
+    if not fields:
+        return video
+    return {key: video[key] for key in fields if key in video}
+
+def page_limit(limit):
+    # A zero or negative limit would never fill a page and return everything
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
 @app.route('/')
 def index():
     return send_from_directory('../frontend', 'production_platform.html')
@@ -40,16 +284,13 @@ def index():
 def login():
     try:
         data = request.get_json()
-        print(f"Login attempt: {data}")
         
         if not data:
             return jsonify({'error': 'No data provided'}), 400
             
         username = data.get('username')
         password = data.get('password')
-        
-        print(f"Username: {username}, Password: {password}")
-        print(f"Available users: {list(users.keys())}")
+        log.info("Login attempt: %s", username)
         
         if not username or not password:
             return jsonify({'error': 'Username and password required'}), 400
@@ -65,7 +306,7 @@ def login():
             })
         return jsonify({'error': 'Invalid credentials'}), 401
     except Exception as e:
-        print(f"Login error: {e}")
+        log.error("Login error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/register', methods=['POST'])
@@ -73,7 +314,6 @@ def register():
     global users
     try:
         data = request.get_json()
-        print(f"Register attempt: {data}")
         
         if not data:
             return jsonify({'error': 'No data provided'}), 400
@@ -88,30 +328,54 @@ def register():
             return jsonify({'error': 'Username already exists'}), 400
         
         users[username] = password
-        print(f"User registered: {username}")
+        journal.record('user_add', username, password)
+        log.info("User registered: %s", username)
         return jsonify({'message': 'Registration successful', 'user_id': username})
         
     except Exception as e:
-        print(f"Register error: {e}")
+        log.error("Register error: %s", e)
         return jsonify({'error': str(e)}), 500
 
 # Video Management
 @app.route('/api/videos', methods=['GET'])
 def get_videos():
-    enhanced_videos = []
-    for video in videos:
-        video_likes = len([l for l in likes if l['video_id'] == video['id'] and l['type'] == 'like'])
-        video_dislikes = len([l for l in likes if l['video_id'] == video['id'] and l['type'] == 'dislike'])
-        video_comments = [c for c in comments if c['video_id'] == video['id']]
+    creator_id = request.args.get('creator_id')
+    fields = requested_fields()
+    limit = request.args.get('limit', type=int)
+    
+    def render():
+        # Without a limit, keep returning the whole catalog as a plain list
+        if not limit:
+            source = videos.by_creator(creator_id) if creator_id else videos
+            return join_array([video_json(video, fields) for video in source])
         
-        enhanced_videos.append({
-            **video,
-            'likes': video_likes,
-            'dislikes': video_dislikes,
-            'comments_count': len(video_comments)
-        })
+        page, next_cursor = videos.page(request.args.get('cursor'), page_limit(limit), creator_id)
+        return (b'{"videos":' + join_array([video_json(video, fields) for video in page]) +
+                b',"next_cursor":' + encode(next_cursor) + b'}')
     
-    return jsonify(enhanced_videos)
+    try:
+        return response_cache.respond(('videos', request.query_string), videos_version(), render)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+@app.route('/api/search', methods=['GET'])
+def search_videos():
+    query = request.args.get('q', '')
+    limit = min(request.args.get('limit', 20, type=int), MAX_PAGE_SIZE)
+    fields = requested_fields()
+    
+    results = []
+    for video_id, score in search_index.search(query, limit):
+        video = videos.get(video_id)
+        if video:
+            results.append({**project({**video, **counters.get(video_id)}, fields), 'score': round(score, 4)})
+    
+    return jsonify({'query': query, 'videos': results})
+
+@app.route('/api/search/suggest', methods=['GET'])
+def search_suggest():
+    limit = min(request.args.get('limit', 10, type=int), MAX_PAGE_SIZE)
+    return jsonify(search_index.suggest(request.args.get('q', ''), limit))
 
 @app.route('/api/upload-video', methods=['POST'])
 def upload_video():
@@ -139,59 +403,169 @@ def upload_video():
         # Save file
         file.save(filepath)
         
-        # Create video record
-        video = {
-            'id': video_id,
-            'title': title or 'Untitled Video',
-            'description': description or '',
-            'creator_id': creator_id,
-            'creator_name': creator_name,
-            'filename': filename,
-            'filepath': filepath,
-            'thumbnail': f'/api/videos/{video_id}/thumbnail',
-            'video_url': f'/api/videos/{video_id}/stream',
-            'duration': 'Unknown',
-            'views': 0,
-            'created_at': datetime.now().isoformat(),
-            'is_live': False,
-            'file_size': os.path.getsize(filepath)
-        }
-        
-        videos.append(video)
+        video = add_uploaded_video(video_id, filename, filepath, title, description, creator_id, creator_name)
         return jsonify({'message': 'Video uploaded successfully', 'video': video})
         
     except Exception as e:
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
 
+def add_uploaded_video(video_id, filename, filepath, title, description, creator_id, creator_name):
+    video = {
+        'id': video_id,
+        'title': title or 'Untitled Video',
+        'description': description or '',
+        'creator_id': creator_id,
+        'creator_name': creator_name,
+        'filename': filename,
+        'filepath': filepath,
+        'thumbnail': f'/api/videos/{video_id}/thumbnail',
+        'video_url': f'/api/videos/{video_id}/stream',
+        'duration': 'Unknown',
+        'views': 0,
+        'created_at': datetime.now().isoformat(),
+        'is_live': False,
+        'file_size': os.path.getsize(filepath)
+    }
+    
+    store_video(video)
+    journal.record('video_add', video)
+    # Duration/resolution/bitrate and the poster frame are filled in later
+    probe_queue.submit(video_id, filepath)
+    poster_generator.submit(video_id, filepath)
+    return video
+
+# Resumable uploads: create a session, PUT chunks at the current offset, then complete
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    filename = data.get('filename') or ''
+    if not allowed_file(filename):
+        return jsonify({'error': 'Invalid file type. Allowed: mp4, avi, mov, wmv, flv, webm, mkv'}), 400
+    
+    try:
+        session = upload_sessions.create(secure_filename(filename), data.get('size'), {
+            'title': data.get('title'),
+            'description': data.get('description'),
+            'creator_id': data.get('creator_id'),
+            'creator_name': data.get('creator_name')
+        })
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    
+    return jsonify(upload_sessions.describe(session)), 201
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    try:
+        return jsonify(upload_sessions.describe(upload_sessions.get(upload_id)))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+def put_upload_chunk(upload_id):
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'Offset required'}), 400
+    
+    try:
+        new_offset = upload_sessions.write_chunk(
+            upload_id, offset, request.stream, request.content_length,
+            request.headers.get('X-Chunk-SHA256'))
+    except UploadError as e:
+        body = {'error': str(e)}
+        if e.offset is not None:
+            body['offset'] = e.offset
+        return jsonify(body), e.status
+    
+    return jsonify({'upload_id': upload_id, 'offset': new_offset})
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    try:
+        session = upload_sessions.finish(upload_id)
+    except UploadError as e:
+        return jsonify({'error': str(e), 'offset': e.offset}), e.status
+    
+    meta = session['metadata']
+    video = add_uploaded_video(upload_id, session['filename'], session['filepath'], meta['title'],
+                               meta['description'], meta['creator_id'], meta['creator_name'])
+    return jsonify({'message': 'Video uploaded successfully', 'video': video})
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def abort_upload(upload_id):
+    try:
+        upload_sessions.abort(upload_id)
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    return jsonify({'message': 'Upload cancelled'})
+
 @app.route('/api/videos/<video_id>/stream')
 def stream_video(video_id):
-    video = next((v for v in videos if v['id'] == video_id), None)
+    video = videos.get(video_id)
     if not video:
         return jsonify({'error': 'Video not found'}), 404
     
-    # Increment view count
-    video['views'] += 1
+    # Count a view when playback starts, not on every seek/range request;
+    # repeats from the same client within the dedup window are ignored
+    if starts_playback(request.headers.get('Range')):
+        view_counter.record(video_id, f"{request.remote_addr}|{request.user_agent.string}")
     
     try:
-        return send_from_directory(app.config['UPLOAD_FOLDER'], video['filename'])
-    except FileNotFoundError:
+        return send_video_file(video_file_path(video))
+    except (FileNotFoundError, KeyError):
         return jsonify({'error': 'Video file not found'}), 404
 
+@app.route('/api/videos/<video_id>/views')
+def get_views(video_id):
+    video = videos.get(video_id)
+    if not video:
+        return jsonify({'error': 'Video not found'}), 404
+    return jsonify({'video_id': video_id, 'views': video.get('views', 0) + view_counter.pending(video_id)})
+
 @app.route('/api/videos/<video_id>/download')
 def download_video(video_id):
-    video = next((v for v in videos if v['id'] == video_id), None)
+    video = videos.get(video_id)
     if not video:
         return jsonify({'error': 'Video not found'}), 404
     
     try:
-        return send_from_directory(app.config['UPLOAD_FOLDER'], video['filename'], as_attachment=True)
-    except FileNotFoundError:
+        return send_video_file(video_file_path(video), as_attachment=True)
+    except (FileNotFoundError, KeyError):
         return jsonify({'error': 'Video file not found'}), 404
 
+def thumbnail_response(digest, fmt, cache_control, vary=None):
+    etag = f'"{digest}"'
+    headers = {'ETag': etag, 'Cache-Control': cache_control}
+    if vary:
+        headers['Vary'] = vary
+    if etag in request.headers.get('If-None-Match', ''):
+        return '', 304, headers
+    
+    data = thumbnail_cache.get(digest, fmt)
+    if data is None:
+        return jsonify({'error': 'Thumbnail not found'}), 404
+    headers['Content-Type'] = THUMBNAIL_FORMATS[fmt][1]
+    return data, 200, headers
+
+@app.route('/api/thumbnails/<digest>.<fmt>')
+def get_thumbnail_by_digest(digest, fmt):
+    if fmt not in THUMBNAIL_FORMATS or len(digest) != 64 or not all(c in '0123456789abcdef' for c in digest):
+        return jsonify({'error': 'Thumbnail not found'}), 404
+    return thumbnail_response(digest, fmt, 'public, max-age=31536000, immutable')
+
 @app.route('/api/videos/<video_id>/thumbnail')
 def get_thumbnail(video_id):
-    # Generate SVG thumbnail with video info
-    video = next((v for v in videos if v['id'] == video_id), None)
+    video = videos.get(video_id)
+    poster = video.get('poster') if video else None
+    if poster:
+        fmt = 'webp' if 'webp' in poster and 'image/webp' in request.headers.get('Accept', '') else 'jpg'
+        if fmt in poster:
+            return thumbnail_response(poster[fmt], fmt, 'public, max-age=300', vary='Accept')
+    
+    # Generate SVG thumbnail with video info until a poster frame exists
     title = video['title'][:20] + '...' if video and len(video['title']) > 20 else (video['title'] if video else 'Video')
     
     svg = f'''<svg width="320" height="180" xmlns="http://www.w3.org/2000/svg">
@@ -206,41 +580,67 @@ def get_thumbnail(video_id):
 
 @app.route('/api/videos/<video_id>', methods=['GET'])
 def get_video(video_id):
-    video = next((v for v in videos if v['id'] == video_id), None)
+    video = videos.get(video_id)
     if not video:
         return jsonify({'error': 'Video not found'}), 404
     
-    video_likes = len([l for l in likes if l['video_id'] == video_id and l['type'] == 'like'])
-    video_dislikes = len([l for l in likes if l['video_id'] == video_id and l['type'] == 'dislike'])
-    video_comments = [c for c in comments if c['video_id'] == video_id]
+    counts = counters.get(video_id)
+    # Only the first page inline; the rest comes from /api/videos/<id>/comments
+    video_comments, next_cursor = comments.page(video_id, limit=COMMENTS_PAGE_SIZE)
     
-    return jsonify({
+    response = {
         **video,
-        'likes': video_likes,
-        'dislikes': video_dislikes,
-        'comments': video_comments
-    })
+        'likes': counts['likes'],
+        'dislikes': counts['dislikes'],
+        'comments': video_comments,
+        'comments_count': counts['comments_count'],
+        'comments_next_cursor': next_cursor
+    }
+    
+    user_id = request.args.get('user_id')
+    if user_id:
+        response['user_reaction'] = likes.user_reaction(video_id, user_id)
+    
+    return jsonify(response)
 
 @app.route('/api/videos/<video_id>/like', methods=['POST'])
 def like_video(video_id):
-    global likes
     data = request.get_json()
     user_id = data.get('user_id')
     like_type = data.get('type')  # 'like' or 'dislike'
     
-    # Remove existing like/dislike from this user
-    likes = [l for l in likes if not (l['video_id'] == video_id and l['user_id'] == user_id)]
-    
-    # Add new like/dislike
-    likes.append({
+    # Replaces any existing like/dislike from this user
+    reaction = {
         'video_id': video_id,
         'user_id': user_id,
         'type': like_type,
         'created_at': datetime.now().isoformat()
-    })
+    }
+    likes.set(video_id, user_id, reaction)
+    journal.record('reaction_set', reaction)
     
     return jsonify({'message': f'{like_type.capitalize()} added successfully'})
 
+@app.route('/api/videos/<video_id>/like', methods=['DELETE'])
+def unlike_video(video_id):
+    data = request.get_json()
+    user_id = data.get('user_id')
+    
+    if not likes.retract(video_id, user_id):
+        return jsonify({'error': 'No reaction to remove'}), 404
+    journal.record('reaction_retract', video_id, user_id)
+    return jsonify({'message': 'Reaction removed'})
+
+@app.route('/api/videos/<video_id>/comments', methods=['GET'])
+def get_comments(video_id):
+    limit = page_limit(request.args.get('limit', COMMENTS_PAGE_SIZE, type=int))
+    try:
+        page, next_cursor = comments.page(video_id, request.args.get('cursor'), limit)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    return jsonify({'comments': page, 'next_cursor': next_cursor})
+
 @app.route('/api/videos/<video_id>/comments', methods=['POST'])
 def add_comment(video_id):
     data = request.get_json()
@@ -255,22 +655,22 @@ def add_comment(video_id):
         'created_at': datetime.now().isoformat()
     }
     
-    comments.append(comment)
+    store_comment(comment)
+    journal.record('comment_add', comment)
     return jsonify(comment)
 
 @app.route('/api/videos/<video_id>/comments/<comment_id>', methods=['DELETE'])
 def delete_comment(video_id, comment_id):
-    global comments
-    comments = [c for c in comments if c['id'] != comment_id]
+    if remove_comment(comment_id):
+        journal.record('comment_delete', comment_id)
     return jsonify({'message': 'Comment deleted'})
 
 @app.route('/api/videos/<video_id>', methods=['DELETE'])
 def delete_video(video_id):
-    global videos, comments, likes
     data = request.get_json()
     user_id = data.get('user_id')
     
-    video = next((v for v in videos if v['id'] == video_id), None)
+    video = videos.get(video_id)
     if not video:
         return jsonify({'error': 'Video not found'}), 404
     
@@ -278,17 +678,8 @@ def delete_video(video_id):
     if video['creator_id'] != user_id and user_id != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    # Delete video file
-    try:
-        if os.path.exists(video['filepath']):
-            os.remove(video['filepath'])
-    except Exception as e:
-        print(f"Error deleting file: {e}")
-    
-    # Remove from database
-    videos = [v for v in videos if v['id'] != video_id]
-    comments = [c for c in comments if c['video_id'] != video_id]
-    likes = [l for l in likes if l['video_id'] != video_id]
+    remove_video(video_id)
+    journal.record('video_delete', video_id)
     
     return jsonify({'message': 'Video deleted successfully'})
 
@@ -298,17 +689,17 @@ def start_live():
     data = request.get_json()
     stream_id = str(uuid.uuid4())
     
-    live_streams[stream_id] = {
+    stream = {
         'id': stream_id,
         'title': data.get('title'),
         'description': data.get('description'),
         'creator_id': data.get('creator_id'),
         'creator_name': data.get('creator_name'),
-        'viewers': 0,
         'started_at': datetime.now().isoformat(),
-        'is_active': True,
-        'chat_messages': []
+        'is_active': True
     }
+    open_stream(stream)
+    journal.record('stream_start', stream)
     
     return jsonify({
         'stream_id': stream_id,
@@ -318,11 +709,70 @@ def start_live():
 
 @app.route('/api/live/<stream_id>')
 def get_live_stream(stream_id):
+    # Look both up once: stop_live may remove them between two checks
+    stream = live_streams.get(stream_id)
+    ring = chat_rings.get(stream_id)
+    if stream is None or ring is None:
+        return jsonify({'error': 'Stream not found'}), 404
+    
+    return jsonify({
+        **stream,
+        **presence.counts(stream_id),
+        'chat_messages': ring.recent(CHAT_RECENT),
+        'chat_seq': ring.last_seq
+    })
+
+@app.route('/api/live/<stream_id>/presence', methods=['POST', 'DELETE'])
+def live_presence(stream_id):
+    # Viewers heartbeat every PRESENCE_TTL / 3 seconds; DELETE on leaving the page
     if stream_id not in live_streams:
         return jsonify({'error': 'Stream not found'}), 404
     
-    live_streams[stream_id]['viewers'] += 1
-    return jsonify(live_streams[stream_id])
+    data = request.get_json(silent=True) or {}
+    viewer_id = str(data.get('viewer_id') or request.remote_addr)[:64]
+    if request.method == 'DELETE':
+        presence.leave(stream_id, viewer_id)
+    elif presence.heartbeat(stream_id, viewer_id) is None:
+        return jsonify({'error': 'Stream not found'}), 404
+    return jsonify(presence.counts(stream_id))
+
+@app.route('/api/live/<stream_id>/chat', methods=['GET'])
+def get_live_chat(stream_id):
+    ring = chat_rings.get(stream_id)
+    if ring is None:
+        return jsonify({'error': 'Stream not found'}), 404
+    
+    since = request.args.get('since', 0, type=int)
+    limit = min(request.args.get('limit', CHAT_BUFFER_SIZE, type=int), CHAT_BUFFER_SIZE)
+    messages, missed = ring.since(since, limit)
+    return jsonify({
+        'messages': messages,
+        'last_seq': messages[-1]['seq'] if messages else max(0, min(since, ring.last_seq)),
+        # Older messages were moved to the archive and are not returned
+        'missed': missed
+    })
+
+@app.route('/api/live/<stream_id>/events')
+def live_stream_events(stream_id):
+    # Server-Sent Events: pushes 'viewers', 'chat' and a final 'end' event
+    if stream_id not in live_streams:
+        return jsonify({'error': 'Stream not found'}), 404
+    
+    hub = live_events.get(stream_id)
+    if stream_id not in live_streams:
+        # Stopped while we were looking; don't leave an orphan hub behind
+        live_events.close(stream_id)
+        return jsonify({'error': 'Stream not found'}), 404
+    
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    try:
+        frames = hub.subscribe(last_id)
+    except HubFull:
+        # Clients fall back to polling
+        return jsonify({'error': 'Too many subscribers'}), 503
+    
+    return Response(frames, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/api/live/<stream_id>/chat', methods=['POST'])
 def add_live_chat(stream_id):
@@ -337,7 +787,17 @@ def add_live_chat(stream_id):
         'timestamp': datetime.now().isoformat()
     }
     
-    live_streams[stream_id]['chat_messages'].append(message)
+    ring = chat_rings.get(stream_id)
+    if ring is None:
+        return jsonify({'error': 'Stream not found'}), 404
+    
+    def announce(message):
+        # Under the ring lock: replay and clients both expect increasing seqs
+        journal.record('stream_chat', stream_id, message)
+        live_events.publish(stream_id, 'chat', message)
+    
+    ring.append(message, announce)
+    response_cache.bump('live')
     return jsonify(message)
 
 @app.route('/api/stop-live/<stream_id>', methods=['POST'])
@@ -347,6 +807,7 @@ def stop_live(stream_id):
     
     # Save as video
     stream_data = live_streams[stream_id]
+    audience = presence.drop(stream_id)
     video = {
         'id': stream_id,
         'title': stream_data['title'],
@@ -354,27 +815,41 @@ def stop_live(stream_id):
         'creator_id': stream_data['creator_id'],
         'creator_name': stream_data['creator_name'],
         'thumbnail': f'/api/videos/{stream_id}/thumbnail',
-        'video_url': f'/api/videos/{stream_id}/stream',
+        # This server only relays stream metadata and chat; no frames reach it,
+        # so there is nothing to play back (live_video_app records its streams)
+        'video_url': None,
+        'recording': None,
         'duration': 'Live Recording',
-        'views': stream_data['viewers'],
+        'views': audience['joins'],
+        'peak_viewers': audience['peak_viewers'],
         'created_at': stream_data['started_at'],
         'is_live': False,
         'was_live': True
     }
     
-    videos.append(video)
-    del live_streams[stream_id]
+    store_video(video)
+    close_stream(stream_id)
+    journal.record('video_add', video)
+    journal.record('stream_stop', stream_id)
     
     return jsonify({'message': 'Stream stopped and saved'})
 
 @app.route('/api/live-streams', methods=['GET'])
 def get_live_streams():
-    return jsonify(list(live_streams.values()))
+    def render():
+        streams = []
+        for stream_id, stream in list(live_streams.items()):
+            ring = chat_rings.get(stream_id)
+            streams.append({**stream, **presence.counts(stream_id),
+                            'chat_count': ring.last_seq if ring else 0})
+        return streams
+    
+    return response_cache.respond('live-streams', response_cache.version('live'), render)
 
 # Share functionality
 @app.route('/api/videos/<video_id>/share', methods=['POST'])
 def share_video(video_id):
-    video = next((v for v in videos if v['id'] == video_id), None)
+    video = videos.get(video_id)
     if not video:
         return jsonify({'error': 'Video not found'}), 404
     
@@ -401,9 +876,18 @@ def health():
         'total_users': len(users),
         'active_streams': len(live_streams),
         'total_comments': len(comments),
-        'total_likes': len(likes)
+        'total_likes': len(likes),
+        'view_counter': view_counter.stats(),
+        'reclaimer': reclaimer.stats(),
+        'live_events': live_events.stats(),
+        'presence': presence.stats(),
+        'response_cache': response_cache.stats(),
+        'video_fragments': video_fragments.stats(),
+        'admission': admission.stats()
     })
 
+restore_state()
+
 if __name__ == '__main__':
     # Add sample data
     sample_videos = [
@@ -422,7 +906,8 @@ if __name__ == '__main__':
             'file_size': 0
         }
     ]
-    videos.extend(sample_videos)
+    for video in sample_videos:
+        store_video(video)
     
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
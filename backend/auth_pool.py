@@ -0,0 +1,75 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+try:
+    from eventlet import tpool
+except ImportError:
+    tpool = None
+
+
+class PoolBusy(Exception):
+    pass
+
+
+class HashPool:
+    """Runs password hashing off the request (green) thread in a bounded pool.
+
+    Under eventlet the work goes through eventlet.tpool, whose native threads
+    hand the result back to the hub, so other green threads keep running while
+    a KDF grinds. Elsewhere a plain ThreadPoolExecutor is used (hashlib drops
+    the GIL while hashing). At most size calls run at once and max_queue more
+    may wait; beyond that PoolBusy is raised so callers can fail fast.
+    """
+
+    def __init__(self, size=4, max_queue=64, green=False):
+        self.size = size
+        self.max_queue = max_queue
+        self.green = green and tpool is not None
+        if self.green:
+            tpool.set_num_threads(size)
+            self._executor = None
+        else:
+            self._executor = ThreadPoolExecutor(size, thread_name_prefix='auth-hash')
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    def run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.size + self.max_queue:
+                self.rejected += 1
+                raise PoolBusy()
+            self.pending += 1
+        started = time.monotonic()
+        try:
+            if self.green:
+                return tpool.execute(fn, *args)
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self.busy_seconds += time.monotonic() - started
+
+    def generate_password_hash(self, password):
+        return self.run(generate_password_hash, password)
+
+    def check_password_hash(self, pwhash, password):
+        return self.run(check_password_hash, pwhash, password)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'eventlet.tpool' if self.green else 'threads',
+                'size': self.size,
+                'max_queue': self.max_queue,
+                'in_flight': min(self.pending, self.size),
+                'queued': max(0, self.pending - self.size),
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_ms': round(self.busy_seconds / self.completed * 1000, 2) if self.completed else 0
+            }
@@ -0,0 +1,284 @@
+import time
+import threading
+
+
+class FrameSlot:
+    """Latest value plus a sequence number; readers block on a Condition for newer ones."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.seq = 0
+        self.value = None
+
+    def publish(self, value):
+        with self._cond:
+            self.seq += 1
+            self.value = value
+            self._cond.notify_all()
+
+    def wait(self, after_seq, timeout=None):
+        """Return (seq, value) once seq > after_seq, or the current pair on timeout."""
+        with self._cond:
+            if self.seq <= after_seq:
+                self._cond.wait_for(lambda: self.seq > after_seq, timeout)
+            return self.seq, self.value
+
+
+class CaptureSource:
+    """Owns one capture device and reads it from a single thread.
+
+    Every frame is published once into a FrameSlot that any number of viewers
+    wait on, so the device handle is never shared between threads and each
+    viewer sees every frame instead of racing the others for reads. The
+    thread runs while at least one stream holds the source.
+
+    Frames are published on a monotonic deadline schedule at fps. The device
+    is drained with grab() in between, and only frames that are due are
+    decoded, so a camera faster than fps never builds up a stale backlog.
+    When the loop falls behind it skips ahead rather than bursting.
+
+    Sinks (e.g. a Recorder) get every published frame and its grab time through
+    offer(frame, timestamp), which is called on the capture thread and so must
+    never block.
+    """
+
+    def __init__(self, open_device, fps=30):
+        self.open_device = open_device      # returns an opened capture, or None
+        self.fps = fps
+        self.frames = FrameSlot()
+        self._lock = threading.Lock()
+        self._users = 0
+        self._sinks = ()
+        self._thread = None
+        self.device = None
+        self.grabbed = 0
+        self.published = 0
+        self.read_failures = 0
+        self._started = None
+
+    @property
+    def is_open(self):
+        device = self.device
+        return device is not None and device.isOpened()
+
+    def acquire(self):
+        with self._lock:
+            self._users += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='capture', daemon=True)
+                self._thread.start()
+
+    def release(self):
+        with self._lock:
+            self._users = max(0, self._users - 1)
+
+    def add_sink(self, sink):
+        with self._lock:
+            self._sinks += (sink,)
+
+    def remove_sink(self, sink):
+        with self._lock:
+            self._sinks = tuple(s for s in self._sinks if s is not sink)
+
+    def _running(self):
+        with self._lock:
+            if self._users:
+                return True
+            self._thread = None
+            return False
+
+    def _run(self):
+        # The device belongs to this thread; a successor started after release()
+        # opens its own rather than inheriting one that is being closed
+        device = None
+        interval = 1.0 / self.fps
+        deadline = self._started = time.monotonic()
+        self.grabbed = self.published = self.read_failures = 0
+        failing = False
+        try:
+            while self._running():
+                if device is None or not device.isOpened():
+                    device = self.device = self.open_device()
+                    if device is None:
+                        time.sleep(1)
+                        continue
+
+                if not device.grab():
+                    # Report a failure streak once, e.g. an unplugged camera
+                    if not failing:
+                        print("Failed to read frame, retrying")
+                        failing = True
+                    self.read_failures += 1
+                    time.sleep(0.1)
+                    continue
+                if failing:
+                    print("Frame reads recovered")
+                    failing = False
+                self.grabbed += 1
+                now = time.monotonic()
+                if now < deadline:
+                    continue
+
+                success, frame = device.retrieve()
+                if not success:
+                    continue
+                self.frames.publish(frame)
+                self.published += 1
+                for sink in self._sinks:
+                    sink.offer(frame, now)
+                deadline += interval
+                if deadline < now:
+                    deadline = now + interval
+        finally:
+            if self.device is device:
+                self.device = None
+            if device is not None:
+                device.release()
+
+    def stats(self):
+        elapsed = time.monotonic() - self._started if self._started else 0
+        return {
+            'target_fps': self.fps,
+            'fps': round(self.published / elapsed, 1) if elapsed else 0,
+            'grabbed': self.grabbed,
+            'published': self.published,
+            'read_failures': self.read_failures
+        }
+
+
+def multipart_chunk(jpeg):
+    """Frame JPEG data as one multipart/x-mixed-replace part, in a single copy."""
+    return b''.join((b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: ',
+                     str(len(jpeg)).encode(), b'\r\n\r\n', jpeg, b'\r\n'))
+
+
+class ViewerStats:
+    """Frames sent to and skipped for one viewer, with a one-second FPS window."""
+
+    def __init__(self, rendition=None):
+        self.rendition = rendition
+        self.started = time.monotonic()
+        self.sent = 0
+        self.dropped = 0
+        self.bytes = 0
+        self.fps = 0.0
+        self._last_seq = None
+        self._window_start = self.started
+        self._window_sent = 0
+
+    def record(self, seq, size):
+        # Anything between the last frame sent and this one was skipped as stale
+        if self._last_seq is not None:
+            self.dropped += max(0, seq - self._last_seq - 1)
+        self._last_seq = seq
+        self.sent += 1
+        self.bytes += size
+        self._window_sent += 1
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self.fps = self._window_sent / (now - self._window_start)
+            self._window_start = now
+            self._window_sent = 0
+
+    def as_dict(self):
+        return {
+            'rendition': self.rendition,
+            'seconds': round(time.monotonic() - self.started, 1),
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'bytes': self.bytes,
+            'fps': round(self.fps, 1)
+        }
+
+
+class FrameEncoder:
+    """Encodes each captured frame once per stream, for every viewer to share.
+
+    The first viewer to ask for a new frame runs render(frame) (overlay and
+    JPEG encode) and frames the result as a multipart chunk; later viewers get
+    that same immutable bytes object, so serving N viewers costs one encode
+    and zero copies per frame.
+    """
+
+    def __init__(self, render):
+        self.render = render        # frame -> JPEG buffer (bytes-like) or None
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._chunk = None
+        self.encoded = 0
+        self.viewers = set()        # ViewerStats of connected viewers
+
+    def subscribe(self, stats=None):
+        stats = stats or ViewerStats()
+        with self._lock:
+            self.viewers.add(stats)
+        return stats
+
+    def unsubscribe(self, stats):
+        with self._lock:
+            self.viewers.discard(stats)
+
+    def stats(self):
+        with self._lock:
+            viewers = list(self.viewers)
+        return {'encoded': self.encoded, 'viewers': [v.as_dict() for v in viewers]}
+
+    def chunk(self, seq, frame):
+        with self._lock:
+            if seq > self._seq:
+                jpeg = self.render(frame)
+                self._chunk = multipart_chunk(jpeg) if jpeg is not None else None
+                self._seq = seq
+                self.encoded += 1
+            return self._chunk
+
+
+class AdaptiveQuality:
+    """Picks a viewer's rendition from the throughput it actually achieves.
+
+    Every window seconds the frames delivered are compared with the frames
+    published: a viewer that got less than 80% of them (its writes are taking
+    too long) moves one rung down; one that has kept up for upgrade_after
+    seconds tries one rung up.
+    """
+
+    def __init__(self, ladder, window=2.0, upgrade_after=10.0):
+        self.ladder = ladder        # rendition names, lowest first
+        self.index = len(ladder) - 1
+        self.window = window
+        self.upgrade_after = upgrade_after
+        self.throughput = 0.0       # bytes/second over the last window
+        self._window_start = self._steady_since = time.monotonic()
+        self._window_seq = None
+        self._sent = 0
+        self._bytes = 0
+
+    @property
+    def current(self):
+        return self.ladder[self.index]
+
+    def record(self, seq, size):
+        """Account for one sent chunk; returns the rendition to use next."""
+        if self._window_seq is None:
+            self._window_seq = seq - 1
+        self._sent += 1
+        self._bytes += size
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < self.window:
+            return self.current
+
+        published = seq - self._window_seq
+        self.throughput = self._bytes / elapsed
+        if self._sent < 0.8 * published and self.index > 0:
+            self.index -= 1
+            self._steady_since = now
+        elif self._sent < 0.95 * published:
+            self._steady_since = now
+        elif now - self._steady_since >= self.upgrade_after and self.index < len(self.ladder) - 1:
+            self.index += 1
+            self._steady_since = now
+        self._window_start = now
+        self._window_seq = seq
+        self._sent = self._bytes = 0
+        return self.current
@@ -0,0 +1,314 @@
+import threading
+from bisect import bisect_right
+
+
+class KeysetOrder:
+    """Append-only key order with O(log n) seek, for cursor pagination.
+
+    Keys get increasing sequence numbers; a cursor is the sequence number of
+    the last key returned, so pages stay stable while keys are added or
+    removed between requests. Removed keys are skipped and compacted lazily.
+    Callers serialize mutations; readers may iterate concurrently.
+    """
+
+    # Compact once this many removed entries pile up
+    COMPACT_THRESHOLD = 1024
+
+    def __init__(self):
+        self._seq_by_key = {}   # key -> sequence number
+        self._seqs = []         # ascending sequence numbers
+        self._keys = []         # keys parallel to _seqs
+        self._holes = 0
+        self._next_seq = 1
+
+    def append(self, key):
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seq_by_key[key] = seq
+        self._seqs.append(seq)
+        self._keys.append(key)
+        return seq
+
+    def discard(self, key):
+        if self._seq_by_key.pop(key, None) is None:
+            return
+        self._holes += 1
+        if self._holes > self.COMPACT_THRESHOLD and self._holes * 2 > len(self._keys):
+            live = [(seq, key) for seq, key in zip(self._seqs, self._keys)
+                    if self._seq_by_key.get(key) == seq]
+            # Swap in new lists so in-flight iterators keep their snapshot
+            self._seqs = [seq for seq, _ in live]
+            self._keys = [key for _, key in live]
+            self._holes = 0
+
+    def seq(self, key):
+        return self._seq_by_key.get(key, 0)
+
+    def keys_after(self, after=0):
+        seqs, keys = self._seqs, self._keys
+        for i in range(bisect_right(seqs, after), len(keys)):
+            key = keys[i]
+            if self._seq_by_key.get(key) == seqs[i]:
+                yield key
+
+    def page(self, items, limit):
+        """Take up to limit items (dicts keyed by 'id') and return (page, next_cursor)."""
+        limit = max(1, limit)
+        page = []
+        for item in items:
+            if len(page) == limit:
+                return page, str(self.seq(page[-1]['id']))
+            page.append(item)
+        return page, None
+
+    def page_after(self, cursor, limit, lookup):
+        after = int(cursor) if cursor else 0
+        items = (item for item in map(lookup, self.keys_after(after)) if item is not None)
+        return self.page(items, limit)
+
+    def __len__(self):
+        return len(self._seq_by_key)
+
+
+class VideoCatalog:
+    """In-memory video store indexed by id and by creator, iterated in upload order."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_id = {}        # video_id -> video dict (insertion ordered)
+        self._by_creator = {}   # creator_id -> {video_id: video}
+        self._order = KeysetOrder()
+        self.version = 0        # bumped on every mutation, for response caching
+        self._revisions = {}    # video_id -> version of its last change
+
+    def add(self, video):
+        with self._lock:
+            video_id = video['id']
+            if video_id in self._by_id:
+                self.remove(video_id)
+            self._by_id[video_id] = video
+            self._by_creator.setdefault(video.get('creator_id'), {})[video_id] = video
+            self._order.append(video_id)
+            self.version += 1
+            self._revisions[video_id] = self.version
+        return video
+
+    # Keep the list-style call sites working
+    append = add
+
+    def extend(self, videos):
+        for video in videos:
+            self.add(video)
+
+    def get(self, video_id):
+        return self._by_id.get(video_id)
+
+    def update(self, video_id, fields):
+        with self._lock:
+            video = self._by_id.get(video_id)
+            if video is not None:
+                video.update(fields)
+                self.version += 1
+                self._revisions[video_id] = self.version
+            return video
+
+    def remove(self, video_id):
+        with self._lock:
+            video = self._by_id.pop(video_id, None)
+            if video is not None:
+                self._unindex(video)
+                self._order.discard(video_id)
+                self.version += 1
+                self._revisions.pop(video_id, None)
+            return video
+
+    def revision(self, video_id):
+        return self._revisions.get(video_id, 0)
+
+    def page(self, cursor=None, limit=20, creator_id=None):
+        """Return (videos, next_cursor) for up to limit videos after cursor."""
+        if creator_id is not None:
+            after = int(cursor) if cursor else 0
+            candidates = (v for v in self.by_creator(creator_id) if self._order.seq(v['id']) > after)
+            return self._order.page(candidates, limit)
+        return self._order.page_after(cursor, limit, self.get)
+
+    def by_creator(self, creator_id):
+        return list(self._by_creator.get(creator_id, {}).values())
+
+    def _unindex(self, video):
+        creator_videos = self._by_creator.get(video.get('creator_id'))
+        if creator_videos is not None:
+            creator_videos.pop(video['id'], None)
+            if not creator_videos:
+                del self._by_creator[video.get('creator_id')]
+
+    def __contains__(self, video_id):
+        return video_id in self._by_id
+
+    def __iter__(self):
+        return iter(list(self._by_id.values()))
+
+    def __len__(self):
+        return len(self._by_id)
+
+
+class EngagementCounters:
+    """Per-video like/dislike/comment totals, updated in O(1) on every mutation."""
+
+    FIELDS = ('likes', 'dislikes', 'comments_count')
+    REACTION_FIELDS = {'like': 'likes', 'dislike': 'dislikes'}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}   # video_id -> {'likes': n, 'dislikes': n, 'comments_count': n}
+        self.version = 0
+        self._revisions = {}    # video_id -> version of its last change
+
+    def add(self, video_id, field, delta=1):
+        with self._lock:
+            counts = self._counts.get(video_id)
+            if counts is None:
+                counts = self._counts[video_id] = dict.fromkeys(self.FIELDS, 0)
+            counts[field] += delta
+            self.version += 1
+            self._revisions[video_id] = self.version
+
+    def add_reaction(self, video_id, reaction_type, delta=1):
+        field = self.REACTION_FIELDS.get(reaction_type)
+        if field:
+            self.add(video_id, field, delta)
+
+    def get(self, video_id):
+        counts = self._counts.get(video_id)
+        return dict(counts) if counts else dict.fromkeys(self.FIELDS, 0)
+
+    def drop(self, video_id):
+        with self._lock:
+            self._counts.pop(video_id, None)
+            self.version += 1
+            self._revisions.pop(video_id, None)
+
+    def revision(self, video_id):
+        return self._revisions.get(video_id, 0)
+
+
+class ReactionMap:
+    """One like/dislike per (video_id, user_id), with O(1) replace, retract and lookup."""
+
+    def __init__(self, counters=None):
+        self._lock = threading.Lock()
+        self._by_video = {}     # video_id -> {user_id: reaction}
+        self._total = 0
+        self.counters = counters
+
+    def set(self, video_id, user_id, reaction):
+        """Store reaction for user_id on video_id and return the one it replaced."""
+        with self._lock:
+            video_reactions = self._by_video.setdefault(video_id, {})
+            previous = video_reactions.pop(user_id, None)
+            video_reactions[user_id] = reaction
+            if previous is None:
+                self._total += 1
+        if self.counters is not None:
+            if previous is not None:
+                self.counters.add_reaction(video_id, previous['type'], -1)
+            self.counters.add_reaction(video_id, reaction['type'])
+        return previous
+
+    def retract(self, video_id, user_id):
+        with self._lock:
+            video_reactions = self._by_video.get(video_id)
+            previous = video_reactions.pop(user_id, None) if video_reactions else None
+            if previous is not None:
+                self._total -= 1
+                if not video_reactions:
+                    del self._by_video[video_id]
+        if previous is not None and self.counters is not None:
+            self.counters.add_reaction(video_id, previous['type'], -1)
+        return previous
+
+    def get(self, video_id, user_id):
+        return self._by_video.get(video_id, {}).get(user_id)
+
+    def user_reaction(self, video_id, user_id):
+        reaction = self.get(video_id, user_id)
+        return reaction['type'] if reaction else None
+
+    def values(self):
+        with self._lock:
+            return [r for video_reactions in self._by_video.values() for r in video_reactions.values()]
+
+    def drop_video(self, video_id):
+        with self._lock:
+            video_reactions = self._by_video.pop(video_id, {})
+            self._total -= len(video_reactions)
+        return list(video_reactions.values())
+
+    def __len__(self):
+        return self._total
+
+
+class CommentStore:
+    """Comments kept per video in posting order, with an id index for O(1) delete."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {}        # comment_id -> comment
+        self._by_video = {}     # video_id -> {comment_id: comment}
+        self._orders = {}       # video_id -> KeysetOrder of comment ids
+
+    def add(self, comment):
+        with self._lock:
+            video_id = comment['video_id']
+            self._by_id[comment['id']] = comment
+            self._by_video.setdefault(video_id, {})[comment['id']] = comment
+            order = self._orders.get(video_id)
+            if order is None:
+                order = self._orders[video_id] = KeysetOrder()
+            order.append(comment['id'])
+        return comment
+
+    def get(self, comment_id):
+        return self._by_id.get(comment_id)
+
+    def remove(self, comment_id):
+        with self._lock:
+            comment = self._by_id.pop(comment_id, None)
+            if comment is None:
+                return None
+            video_id = comment['video_id']
+            del self._by_video[video_id][comment_id]
+            self._orders[video_id].discard(comment_id)
+            if not self._by_video[video_id]:
+                del self._by_video[video_id]
+                del self._orders[video_id]
+            return comment
+
+    def drop_video(self, video_id):
+        with self._lock:
+            video_comments = self._by_video.pop(video_id, {})
+            self._orders.pop(video_id, None)
+            for comment_id in video_comments:
+                del self._by_id[comment_id]
+        return list(video_comments.values())
+
+    def page(self, video_id, cursor=None, limit=20):
+        order = self._orders.get(video_id)
+        if order is None:
+            return [], None
+        video_comments = self._by_video.get(video_id, {})
+        return order.page_after(cursor, limit, video_comments.get)
+
+    def count(self, video_id):
+        return len(self._by_video.get(video_id, ()))
+
+    def values(self):
+        with self._lock:
+            return list(self._by_id.values())
+
+    def __contains__(self, comment_id):
+        return comment_id in self._by_id
+
+    def __len__(self):
+        return len(self._by_id)
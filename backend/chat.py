@@ -0,0 +1,142 @@
+import os
+import json
+import queue
+import threading
+
+
+class ArchiveWriter:
+    """Appends archived chat messages to their files from one background thread.
+
+    Rings only enqueue, so a post that evicts a message never waits on disk
+    I/O while holding its ring's lock. One FIFO keeps each file in seq order.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._files = {}    # path -> open file
+        self._thread = threading.Thread(target=self._run, name='chat-archive', daemon=True)
+        self._thread.start()
+
+    def write(self, path, messages):
+        self._queue.put((path, messages))
+
+    def close(self, path):
+        self._queue.put((path, None))
+
+    def flush(self):
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            path, messages = self._queue.get()
+            try:
+                if messages is None:
+                    f = self._files.pop(path, None)
+                    if f is not None:
+                        f.close()
+                    continue
+                f = self._files.get(path)
+                if f is None:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    f = self._files[path] = open(path, 'a')
+                f.write(''.join(json.dumps(m) + '\n' for m in messages))
+                f.flush()
+            except OSError as e:
+                print(f"Chat archive error: {e}")
+            finally:
+                self._queue.task_done()
+
+
+class ChatRing:
+    """Fixed-capacity live chat buffer with monotonically increasing sequence numbers.
+
+    Messages that fall out of the ring are appended to an archive file
+    (one JSON object per line) by an ArchiveWriter, so readers polling with
+    ``since`` only ever touch the newest capacity messages in memory.
+    """
+
+    def __init__(self, capacity=500, archive_path=None, writer=None):
+        self.capacity = capacity
+        self.archive_path = archive_path
+        self._lock = threading.Lock()
+        self._slots = [None] * capacity
+        self._next_seq = 1
+        self._writer = writer or (ArchiveWriter() if archive_path else None)
+        self._archived_seq = self._read_archived_seq()
+
+    @property
+    def last_seq(self):
+        return self._next_seq - 1
+
+    def append(self, message, on_append=None):
+        """Store message, assigning it the next 'seq', and return it.
+
+        on_append(message) runs under the ring lock, so whatever it records
+        (journal, event stream) sees messages in seq order.
+        """
+        with self._lock:
+            message['seq'] = self._next_seq
+            self._store(message)
+            if on_append:
+                on_append(message)
+        return message
+
+    def restore(self, message):
+        """Re-insert a message that already has a seq (snapshot/journal replay)."""
+        with self._lock:
+            if message['seq'] < self._next_seq:
+                return False
+            self._next_seq = message['seq']
+            self._store(message)
+            return True
+
+    def _store(self, message):
+        slot = message['seq'] % self.capacity
+        evicted = self._slots[slot]
+        self._slots[slot] = message
+        self._next_seq = message['seq'] + 1
+        if evicted is not None:
+            self._spill([evicted])
+
+    def since(self, seq=0, limit=None):
+        """Return (messages after seq, missed) where missed means some were archived."""
+        with self._lock:
+            oldest = max(1, self._next_seq - self.capacity)
+            start = max(seq + 1, oldest)
+            end = self._next_seq if limit is None else min(self._next_seq, start + limit)
+            messages = [self._slots[s % self.capacity] for s in range(start, end)]
+        return [m for m in messages if m is not None], seq + 1 < oldest
+
+    def recent(self, count):
+        return self.since(max(0, self.last_seq - count))[0]
+
+    def _read_archived_seq(self):
+        # Replay may re-evict messages spilled before a restart; skip those
+        try:
+            with open(self.archive_path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 4096))
+                lines = f.read().splitlines()
+            return json.loads(lines[-1])['seq'] if lines else 0
+        except (OSError, TypeError, ValueError, KeyError):
+            return 0
+
+    def _spill(self, messages):
+        messages = [m for m in messages if m['seq'] > self._archived_seq]
+        if not self.archive_path or not messages:
+            return
+        self._writer.write(self.archive_path, messages)
+        self._archived_seq = messages[-1]['seq']
+
+    def close(self):
+        """Spill everything still in memory so the archive holds the full chat."""
+        with self._lock:
+            self._spill(self._in_order())
+            self._slots = [None] * self.capacity
+            if self._writer:
+                self._writer.close(self.archive_path)
+
+    def _in_order(self):
+        oldest = max(1, self._next_seq - self.capacity)
+        messages = [self._slots[s % self.capacity] for s in range(oldest, self._next_seq)]
+        return [m for m in messages if m is not None]
@@ -0,0 +1,148 @@
+import json
+import threading
+from collections import deque
+
+HEARTBEAT_INTERVAL = 15     # seconds between keep-alive comments on idle streams
+
+
+class HubFull(Exception):
+    pass
+
+
+def format_event(event_id, event, data):
+    return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+class BroadcastHub:
+    """Fan-out of one stream's events to its Server-Sent Events subscribers.
+
+    Each event is formatted once and kept in a short backlog, so a reconnecting
+    client can resume from its Last-Event-ID. Subscribers block on a shared
+    Condition between events, which keeps idle connections nearly free.
+    """
+
+    def __init__(self, max_subscribers=1000, backlog=256):
+        self.max_subscribers = max_subscribers
+        self._cond = threading.Condition()
+        self._backlog = deque(maxlen=backlog)   # (event_id, frame)
+        self._next_id = 1
+        self.subscribers = 0
+        self.closed = False
+
+    def publish(self, event, data):
+        with self._cond:
+            if self.closed:
+                return
+            self._backlog.append((self._next_id, format_event(self._next_id, event, data)))
+            self._next_id += 1
+            self._cond.notify_all()
+
+    def close(self, event='end', data=None):
+        with self._cond:
+            if self.closed:
+                return
+            self._backlog.append((self._next_id, format_event(self._next_id, event, data or {})))
+            self._next_id += 1
+            self.closed = True
+            self._cond.notify_all()
+
+    def _frames_after(self, last_id):
+        # An id from before a restart, or older than the backlog, cannot be
+        # replayed; the client is told to resync instead
+        if last_id >= self._next_id:
+            return [], True
+        if not self._backlog:
+            return [], False
+        missed = last_id < self._backlog[0][0] - 1
+        return [frame for event_id, frame in self._backlog if event_id > last_id], missed
+
+    def subscribe(self, last_id=None, heartbeat=HEARTBEAT_INTERVAL):
+        """Return an iterable of SSE frames, starting after last_id (None = now).
+
+        The subscriber slot is held until the iterable is closed, which WSGI
+        servers do when the response ends or the client goes away.
+        """
+        with self._cond:
+            if self.subscribers >= self.max_subscribers:
+                raise HubFull()
+            self.subscribers += 1
+            if last_id is None:
+                last_id = self._next_id - 1
+        return Subscription(self, last_id, heartbeat)
+
+
+class Subscription:
+    def __init__(self, hub, last_id, heartbeat):
+        self.hub = hub
+        self.last_id = last_id
+        self.heartbeat = heartbeat
+        self._started = False
+        self._done = False
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._started:
+            self._started = True
+            return b'retry: 3000\n\n'
+        if self._done:
+            self.close()
+            raise StopIteration
+        hub = self.hub
+        with hub._cond:
+            frames, missed = hub._frames_after(self.last_id)
+            if not frames and not missed and not hub.closed:
+                hub._cond.wait(self.heartbeat)
+                frames, missed = hub._frames_after(self.last_id)
+            self.last_id = hub._next_id - 1
+            self._done = hub.closed
+        chunk = b'event: resync\ndata: {}\n\n' if missed else b''
+        if frames:
+            chunk += b''.join(frames)
+        elif not chunk:
+            if self._done:
+                self.close()
+                raise StopIteration
+            chunk = b': ping\n\n'
+        return chunk
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            with self.hub._cond:
+                self.hub.subscribers -= 1
+
+
+class EventHubs:
+    """Per-stream BroadcastHub registry."""
+
+    def __init__(self, max_subscribers=1000):
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._hubs = {}
+
+    def get(self, stream_id):
+        with self._lock:
+            hub = self._hubs.get(stream_id)
+            if hub is None:
+                hub = self._hubs[stream_id] = BroadcastHub(self.max_subscribers)
+            return hub
+
+    def publish(self, stream_id, event, data):
+        with self._lock:
+            hub = self._hubs.get(stream_id)
+        if hub:
+            hub.publish(event, data)
+
+    def close(self, stream_id, data=None):
+        with self._lock:
+            hub = self._hubs.pop(stream_id, None)
+        if hub:
+            hub.close('end', data)
+
+    def stats(self):
+        with self._lock:
+            hubs = list(self._hubs.values())
+        return {'streams': len(hubs), 'subscribers': sum(h.subscribers for h in hubs)}
@@ -0,0 +1,54 @@
+import json
+import threading
+
+
+def encode(value):
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+def join_array(fragments):
+    return b'[' + b','.join(fragments) + b']'
+
+
+class FragmentCache:
+    """Per-item JSON encodings, re-encoded only when the item's stamp changes.
+
+    List responses are assembled by joining the cached bytes, so a listing in
+    which one video changed costs one json.dumps instead of one per video.
+    Fragments are kept per (item, variant), e.g. per requested field set.
+    """
+
+    def __init__(self, max_variants=8):
+        self.max_variants = max_variants
+        self._lock = threading.Lock()
+        self._items = {}    # key -> {variant: (stamp, bytes)}
+        self.encoded = 0
+
+    def get(self, key, stamp, render, variant=None):
+        variants = self._items.get(key)
+        entry = variants.get(variant) if variants else None
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        data = encode(render())
+        with self._lock:
+            variants = self._items.setdefault(key, {})
+            if variant not in variants and len(variants) >= self.max_variants:
+                # Unusual field selections shouldn't grow memory without bound
+                variants.pop(next(iter(variants)))
+            variants[variant] = (stamp, data)
+            self.encoded += 1
+        return data
+
+    def discard(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'items': len(self._items),
+                'bytes': sum(len(data) for variants in self._items.values()
+                             for _, data in variants.values()),
+                'encoded': self.encoded
+            }
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import queue
+import threading
+
+
+class Journal:
+    """Append-only operation log with periodic compacted snapshots.
+
+    Request handlers only enqueue (op, args); a single writer thread appends
+    them to ``journal-<gen>.log`` with one fsync per batch and, every
+    snapshot_interval seconds or snapshot_ops operations, rotates to a new
+    journal segment and writes a full snapshot from capture(). Replayed ops
+    must be idempotent: ops enqueued while a snapshot is being captured land
+    in the new segment and may already be reflected in the snapshot.
+    """
+
+    def __init__(self, folder, snapshot_interval=300, snapshot_ops=100000):
+        self.folder = folder
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_ops = snapshot_ops
+        self.snapshot_path = os.path.join(folder, 'snapshot.json')
+        self._queue = queue.Queue()
+        self._thread = None
+        self._file = None
+        self._gen = 0
+        self._ops_since_snapshot = 0
+        self._last_snapshot = time.time()
+        self._capture = None
+        os.makedirs(folder, exist_ok=True)
+
+    def _segment_path(self, gen):
+        return os.path.join(self.folder, f'journal-{gen:08d}.log')
+
+    def _segments(self):
+        gens = []
+        for name in os.listdir(self.folder):
+            if name.startswith('journal-') and name.endswith('.log'):
+                gens.append(int(name[8:-4]))
+        return sorted(gens)
+
+    def load(self):
+        """Return (snapshot_state, ops) where ops yields (op, args) to replay in order."""
+        state, first_gen = None, 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            state, first_gen = snapshot['state'], snapshot['journal']
+
+        gens = [gen for gen in self._segments() if gen >= first_gen]
+        # Append to a fresh segment: the last one may end in a torn line, and
+        # anything written after it would be skipped on the next replay
+        self._gen = max(gens + [first_gen]) + 1
+        return state, self._replay(gens)
+
+    def _replay(self, gens):
+        for gen in gens:
+            with open(self._segment_path(gen)) as f:
+                for line in f:
+                    try:
+                        op, args = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash: nothing after it was acknowledged
+                        break
+                    yield op, args
+
+    def start(self, capture):
+        self._capture = capture
+        self._thread = threading.Thread(target=self._run, name='journal-writer', daemon=True)
+        self._thread.start()
+
+    def record(self, op, *args):
+        self._queue.put((op, args))
+
+    def flush(self):
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except queue.Empty:
+                self._maybe_snapshot()
+                continue
+
+            batch = [item]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._append(batch)
+            except Exception as e:
+                print(f"Journal write error: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            self._maybe_snapshot()
+
+    def _append(self, batch):
+        if self._file is None:
+            self._file = open(self._segment_path(self._gen), 'a')
+        self._file.write(''.join(json.dumps([op, args]) + '\n' for op, args in batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._ops_since_snapshot += len(batch)
+
+    def _maybe_snapshot(self):
+        # Nothing is written until something was recorded, so a process that
+        # only reads (e.g. the debug reloader parent) never touches the files
+        if not self._ops_since_snapshot:
+            return
+        if (self._ops_since_snapshot < self.snapshot_ops
+                and time.time() - self._last_snapshot < self.snapshot_interval):
+            return
+        try:
+            self.snapshot()
+        except Exception as e:
+            print(f"Snapshot error: {e}")
+
+    def snapshot(self):
+        # Rotate first so every op not yet in the old segment goes to the new one
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._gen += 1
+        self._file = open(self._segment_path(self._gen), 'a')
+
+        state = self._capture()
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'journal': self._gen, 'state': state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        for gen in self._segments():
+            if gen < self._gen:
+                os.remove(self._segment_path(gen))
+        self._ops_since_snapshot = 0
+        self._last_snapshot = time.time()
@@ -1,25 +1,41 @@
 import os
 import cv2
-import json
 import uuid
 from datetime import datetime
 from flask import Flask, request, jsonify, send_from_directory, Response
 from flask_cors import CORS
-import threading
-import time
+from werkzeug.utils import secure_filename
+from events import EventHubs, HubFull
+from broadcast import CaptureSource, FrameEncoder, ViewerStats, AdaptiveQuality
+from recorder import Recorder, CODECS
+from media import send_video_file
 
 app = Flask(__name__)
 app.secret_key = 'live-video-key'
 CORS(app)
 
+LIVE_FPS = int(os.environ.get('LIVE_FPS', 30))
+RECORDINGS_FOLDER = os.environ.get('RECORDINGS_FOLDER', 'recordings')
+RECORD_SEGMENT_SECONDS = int(os.environ.get('RECORD_SEGMENT_SECONDS', 60))
+
+# Rendition ladder, lowest first: name -> (width, height, JPEG quality).
+# The camera captures at the top rung; smaller rungs are resized from it.
+RENDITIONS = {
+    '240p': (320, 240, 60),
+    '360p': (480, 360, 70),
+    '480p': (640, 480, 85)
+}
+LADDER = list(RENDITIONS)
+
 # Storage
 users = {'admin': 'admin123', 'creator1': 'pass123'}
 videos = []
 live_streams = {}
-camera = None
+live_events = EventHubs()
+encoders = {}       # stream_id -> {rendition: FrameEncoder}
+recorders = {}      # stream_id -> Recorder, until its recording is finalized
 
-def init_camera():
-    global camera
+def open_camera():
     try:
         # Try different camera indices
         for i in range(3):
@@ -29,11 +45,12 @@ def init_camera():
                 # Test if we can read a frame
                 ret, frame = camera.read()
                 if ret:
-                    camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                    camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                    camera.set(cv2.CAP_PROP_FPS, 30)
+                    width, height, _ = RENDITIONS[LADDER[-1]]
+                    camera.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                    camera.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+                    camera.set(cv2.CAP_PROP_FPS, LIVE_FPS)
                     print(f"✅ Camera {i} initialized successfully")
-                    return True
+                    return camera
                 else:
                     camera.release()
             else:
@@ -41,42 +58,78 @@ def init_camera():
                     camera.release()
         
         print("❌ No working camera found")
-        camera = None
-        return False
+        return None
     except Exception as e:
         print(f"❌ Camera error: {e}")
-        camera = None
+        return None
+
+# One thread reads the camera while any stream is live; viewers share its frames
+capture = CaptureSource(open_camera, fps=LIVE_FPS)
+
+def init_camera():
+    if capture.is_open:
+        return True
+    # Nothing is capturing, so the device is free to probe
+    camera = open_camera()
+    if camera is None:
         return False
+    camera.release()
+    return True
 
-def generate_frames(stream_id):
-    global camera
-    while stream_id in live_streams:
-        if camera is None or not camera.isOpened():
-            if not init_camera():
-                time.sleep(1)
+def render_frame(stream, frame, width, height, quality):
+    # Resize, or copy: the captured frame is shared and must not be drawn on
+    if frame.shape[1] > width:
+        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    else:
+        frame = frame.copy()
+    
+    # Add stream info overlay, scaled to the rendition
+    scale = frame.shape[1] / 640
+    cv2.putText(frame, f"LIVE: {stream['title']}", 
+               (10, int(30 * scale)), cv2.FONT_HERSHEY_SIMPLEX, 0.7 * scale, (0, 255, 0), 2)
+    cv2.putText(frame, f"Viewers: {stream['viewers']}", 
+               (10, int(60 * scale)), cv2.FONT_HERSHEY_SIMPLEX, 0.5 * scale, (255, 255, 255), 1)
+    
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buffer if ret else None
+
+def rendition_encoders(stream):
+    # An encoder only does work when a viewer asks it for a frame, so rungs
+    # nobody is watching cost nothing
+    def renderer(width, height, quality):
+        return lambda frame: render_frame(stream, frame, width, height, quality)
+    return {name: FrameEncoder(renderer(*RENDITIONS[name])) for name in LADDER}
+
+def generate_frames(stream_id, renditions, quality):
+    # 'auto' starts at the top rung and follows the viewer's throughput
+    picker = AdaptiveQuality(LADDER) if quality == 'auto' else None
+    rendition = picker.current if picker else quality
+    encoder = renditions[rendition]
+    stats = encoder.subscribe(ViewerStats(rendition))
+    try:
+        seq = 0
+        while stream_id in live_streams:
+            # Always the newest frame: a viewer still sending the last one
+            # skips whatever was published meanwhile instead of queueing it
+            latest, frame = capture.frames.wait(seq, timeout=1.0)
+            if latest == seq or frame is None:
                 continue
-        
-        success, frame = camera.read()
-        if not success:
-            print("Failed to read frame")
-            time.sleep(0.1)
-            continue
-        
-        # Add stream info overlay
-        cv2.putText(frame, f"LIVE: {live_streams[stream_id]['title']}", 
-                   (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        cv2.putText(frame, f"Viewers: {live_streams[stream_id]['viewers']}", 
-                   (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        if not ret:
-            continue
+            seq = latest
             
-        frame_bytes = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-        
-        time.sleep(0.033)  # ~30 FPS
+            # Encoded once per frame; every viewer yields the same bytes object
+            chunk = encoder.chunk(seq, frame)
+            if chunk is None:
+                continue
+            stats.record(seq, len(chunk))
+            yield chunk
+            
+            if picker and picker.record(seq, len(chunk)) != rendition:
+                encoder.unsubscribe(stats)
+                rendition = stats.rendition = picker.current
+                encoder = renditions[rendition]
+                encoder.subscribe(stats)
+    finally:
+        encoder.unsubscribe(stats)
 
 @app.route('/')
 def index():
@@ -130,9 +183,13 @@ def start_live():
         'is_active': True
     }
     
-    # Initialize camera if not done
-    if camera is None:
-        init_camera()
+    stream = live_streams[stream_id]
+    encoders[stream_id] = rendition_encoders(stream)
+    recorder = recorders[stream_id] = Recorder(
+        RECORDINGS_FOLDER, stream_id, LIVE_FPS, RECORD_SEGMENT_SECONDS,
+        on_finished=lambda path, info: recording_finished(stream_id, path, info))
+    capture.add_sink(recorder)
+    capture.acquire()
     
     return jsonify({
         'stream_id': stream_id,
@@ -142,15 +199,52 @@ def start_live():
 
 @app.route('/api/stream/<stream_id>')
 def video_stream(stream_id):
-    if stream_id not in live_streams:
+    renditions = encoders.get(stream_id)
+    if stream_id not in live_streams or renditions is None:
         return "Stream not found", 404
     
+    quality = request.args.get('quality', 'auto')
+    if quality != 'auto' and quality not in RENDITIONS:
+        return jsonify({'error': f"Unknown quality; use auto or one of {', '.join(LADDER)}"}), 400
+    
     # Increment viewer count
     live_streams[stream_id]['viewers'] += 1
+    live_events.publish(stream_id, 'viewers', {'viewers': live_streams[stream_id]['viewers']})
     
-    return Response(generate_frames(stream_id),
+    return Response(generate_frames(stream_id, renditions, quality),
                    mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route('/api/stream/<stream_id>/stats')
+def video_stream_stats(stream_id):
+    renditions = encoders.get(stream_id)
+    if renditions is None:
+        return jsonify({'error': 'Stream not found'}), 404
+    recorder = recorders.get(stream_id)
+    return jsonify({
+        'capture': capture.stats(),
+        'recording': recorder.stats() if recorder else None,
+        'renditions': {name: encoder.stats() for name, encoder in renditions.items()}
+    })
+
+@app.route('/api/live/<stream_id>/events')
+def live_stream_events(stream_id):
+    # Server-Sent Events: pushes 'viewers' updates and a final 'end' event
+    if stream_id not in live_streams:
+        return jsonify({'error': 'Stream not found'}), 404
+    
+    hub = live_events.get(stream_id)
+    if stream_id not in live_streams:
+        live_events.close(stream_id)
+        return jsonify({'error': 'Stream not found'}), 404
+    
+    try:
+        frames = hub.subscribe(request.headers.get('Last-Event-ID', type=int))
+    except HubFull:
+        return jsonify({'error': 'Too many subscribers'}), 503
+    
+    return Response(frames, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/stop-live/<stream_id>', methods=['POST'])
 def stop_live(stream_id):
     if stream_id in live_streams:
@@ -165,6 +259,7 @@ def stop_live(stream_id):
             'thumbnail': f'/api/videos/{stream_id}/thumbnail',
             'video_url': f'/api/videos/{stream_id}/playback',
             'duration': '00:00',
+            'recording': 'processing',
             'views': stream_data['viewers'],
             'likes': 0,
             'dislikes': 0,
@@ -176,11 +271,66 @@ def stop_live(stream_id):
         
         # Remove from live streams
         del live_streams[stream_id]
+        encoders.pop(stream_id, None)
+        recorder = recorders.get(stream_id)
+        if recorder:
+            # The recorder finishes writing and finalizes the file in the background
+            capture.remove_sink(recorder)
+            recorder.stop()
+            if recorder.status in ('ready', 'failed'):
+                # It already finished (after an error) before the video existed
+                recording_finished(stream_id, recorder.path, recorder.stats())
+        capture.release()
+        live_events.close(stream_id)
         
         return jsonify({'message': 'Stream stopped and saved'})
     
     return jsonify({'error': 'Stream not found'}), 404
 
+def recording_finished(stream_id, path, info):
+    # Once finalized, playback finds the file on disk; a recorder that failed
+    # mid-stream stays registered so stop_live can still detach it
+    if stream_id not in live_streams:
+        recorders.pop(stream_id, None)
+    video = next((v for v in videos if v['id'] == stream_id), None)
+    if video is None:
+        return
+    if path:
+        seconds = int(info['seconds'])
+        video['duration'] = f'{seconds // 60:02d}:{seconds % 60:02d}'
+        # Without an H.264 or VP8 encoder the file is kept but won't play in <video>
+        video['recording'] = 'ready' if info['browser_playable'] else 'unplayable'
+        video['file_path'] = path
+    else:
+        video['recording'] = 'failed'
+
+def recording_path(video_id):
+    # Finalized recordings are <stream_id>.<ext> in RECORDINGS_FOLDER, so they
+    # can still be found after a restart has emptied recorders
+    for ext in sorted({codec[1] for codec in CODECS}):
+        path = os.path.join(RECORDINGS_FOLDER, secure_filename(video_id) + ext)
+        if os.path.isfile(path):
+            return path
+    return None
+
+@app.route('/api/videos/<video_id>/playback')
+def playback(video_id):
+    recorder = recorders.get(video_id)
+    if recorder is not None and recorder.status in ('recording', 'finalizing'):
+        response = jsonify({'error': 'Recording is still being processed'})
+        response.status_code = 202
+        response.headers['Retry-After'] = '5'
+        return response
+    
+    path = recorder.path if recorder is not None else recording_path(video_id)
+    if not path:
+        return jsonify({'error': 'Recording not found'}), 404
+    
+    try:
+        return send_video_file(path)
+    except FileNotFoundError:
+        return jsonify({'error': 'Recording file not found'}), 404
+
 @app.route('/api/live-streams', methods=['GET'])
 def get_live_streams():
     return jsonify(list(live_streams.values()))
@@ -215,13 +365,12 @@ def get_video(video_id):
 
 @app.route('/api/videos/<video_id>/thumbnail')
 def get_thumbnail(video_id):
-    # Generate thumbnail from current frame
-    if camera and camera.isOpened():
-        ret, frame = camera.read()
+    # Generate thumbnail from the latest captured frame
+    frame = capture.frames.value
+    if frame is not None:
+        ret, buffer = cv2.imencode('.jpg', frame)
         if ret:
-            ret, buffer = cv2.imencode('.jpg', frame)
-            if ret:
-                return Response(buffer.tobytes(), mimetype='image/jpeg')
+            return Response(buffer.tobytes(), mimetype='image/jpeg')
     
     # Fallback placeholder
     return send_from_directory('../assets', 'placeholder.jpg')
@@ -237,7 +386,8 @@ def camera_test():
 def health():
     return jsonify({
         'status': 'healthy',
-        'camera_available': camera is not None and camera.isOpened(),
+        'camera_available': capture.is_open,
+        'capture': capture.stats(),
         'active_streams': len(live_streams),
         'total_videos': len(videos)
     })
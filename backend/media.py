@@ -0,0 +1,144 @@
+import os
+import mimetypes
+from flask import Response, request
+
+# Read size for ranges that end before EOF, and for everything when the server
+# has no wsgi.file_wrapper
+CHUNK_SIZE = 256 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def file_etag(st):
+    return f'"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """Parse a single-range ``Range`` header into an inclusive (start, end) pair.
+
+    Returns None when the header is absent or not a bytes range. Multiple
+    ranges are rejected rather than served as multipart/byteranges.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes':
+        return None
+    if ',' in spec:
+        raise RangeNotSatisfiable('Multiple ranges are not supported')
+
+    first, sep, last = spec.strip().partition('-')
+    if not sep:
+        raise RangeNotSatisfiable('Malformed range')
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable('Empty suffix range')
+            start = max(size - length, 0)
+            end = size - 1
+    except ValueError:
+        raise RangeNotSatisfiable('Malformed range')
+
+    if start < 0 or end < start or start >= size:
+        raise RangeNotSatisfiable('Range outside of file')
+    return start, min(end, size - 1)
+
+
+def starts_playback(range_header):
+    """True for requests that begin a playback rather than seek within one."""
+    if not range_header:
+        return True
+    try:
+        byte_range = parse_range(range_header, float('inf'))
+    except RangeNotSatisfiable:
+        return False
+    return byte_range is None or byte_range[0] == 0
+
+
+def _read_range(f, start, length):
+    try:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def send_video_file(path, as_attachment=False):
+    """Serve path with single-range, ETag/If-Range and zero-copy support.
+
+    Responses that run to the end of the file (the whole file, or the
+    ``bytes=N-`` ranges <video> sends) go through ``wsgi.file_wrapper`` when
+    the server has one (gunicorn, uWSGI), so it can sendfile() them from the
+    current offset. Ranges that end earlier are read through a length-limited
+    generator: many servers (the Werkzeug dev server, wsgiref, eventlet) send a
+    wrapped file to EOF regardless of Content-Length.
+    """
+    f = open(path, 'rb')
+    try:
+        st = os.fstat(f.fileno())
+        size = st.st_size
+        etag = file_etag(st)
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        headers = {
+            'Accept-Ranges': 'bytes',
+            'ETag': etag,
+        }
+        if as_attachment:
+            headers['Content-Disposition'] = f'attachment; filename="{os.path.basename(path)}"'
+
+        # If-None-Match is evaluated before Range: a cached copy is still
+        # current whichever part of it the client asks for
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in if_none_match or if_none_match.strip() == '*':
+            f.close()
+            return Response(status=304, headers=headers)
+
+        range_header = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        # A stale If-Range validator means the client gets the whole new file
+        if range_header and if_range and if_range.strip() != etag:
+            range_header = None
+
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            f.close()
+            headers['Content-Range'] = f'bytes */{size}'
+            return Response(status=416, headers=headers)
+
+        if byte_range is None:
+            start, end, status = 0, size - 1, 200
+        else:
+            start, end = byte_range
+            status = 206
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        length = end - start + 1 if size else 0
+        headers['Content-Length'] = str(length)
+
+        file_wrapper = request.environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None and end == size - 1:
+            f.seek(start)
+            body = file_wrapper(f, CHUNK_SIZE)
+        else:
+            body = _read_range(f, start, length)
+    except Exception:
+        f.close()
+        raise
+
+    response = Response(body, status=status, mimetype=mimetype, headers=headers,
+                        direct_passthrough=True)
+    response.call_on_close(f.close)
+    response.last_modified = st.st_mtime
+    return response
@@ -5,8 +5,9 @@ from datetime import datetime
 from flask import Flask, request, jsonify, session
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash
 from models import db, User, Podcast, LiveSession, ChatMessage
+from auth_pool import HashPool, PoolBusy
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'podcast-secret-key')
@@ -19,6 +20,11 @@ db.init_app(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 CORS(app)
 
+# Password KDFs are slow on purpose; keep them off the Socket.IO event loop
+hash_pool = HashPool(size=int(os.environ.get('AUTH_POOL_SIZE', 4)),
+                     max_queue=int(os.environ.get('AUTH_POOL_QUEUE', 64)),
+                     green=socketio.async_mode == 'eventlet')
+
 # In-memory storage for active rooms
 active_rooms = {}
 
@@ -34,10 +40,15 @@ def register():
     if User.query.filter_by(username=username).first():
         return jsonify({'error': 'Username already exists'}), 400
     
+    try:
+        password_hash = hash_pool.generate_password_hash(password)
+    except PoolBusy:
+        return jsonify({'error': 'Server busy, try again shortly'}), 503
+    
     user = User(
         username=username,
         email=email,
-        password_hash=generate_password_hash(password),
+        password_hash=password_hash,
         is_creator=is_creator
     )
     db.session.add(user)
@@ -53,7 +64,11 @@ def login():
     password = data.get('password')
     
     user = User.query.filter_by(username=username).first()
-    if user and check_password_hash(user.password_hash, password):
+    try:
+        valid = user is not None and hash_pool.check_password_hash(user.password_hash, password)
+    except PoolBusy:
+        return jsonify({'error': 'Server busy, try again shortly'}), 503
+    if valid:
         session['user_id'] = user.id
         return jsonify({
             'message': 'Login successful',
@@ -269,7 +284,11 @@ def handle_disconnect():
 # ============ Health Check ============
 @app.route('/health')
 def health_check():
-    return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()})
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.utcnow().isoformat(),
+        'auth_pool': hash_pool.stats()
+    })
 
 @app.route('/')
 def index():
@@ -0,0 +1,129 @@
+import time
+import threading
+
+
+class _StreamPresence:
+    __slots__ = ('viewers', 'peak', 'joins')
+
+    def __init__(self):
+        self.viewers = {}   # viewer_id -> deadline tick
+        self.peak = 0
+        self.joins = 0
+
+
+class PresenceTracker:
+    """Live viewer presence from heartbeats, expired with a hashed timing wheel.
+
+    A viewer counts as watching until ttl seconds after its last heartbeat.
+    Entries sit in the wheel slot of their deadline tick and are moved on each
+    heartbeat, so the expiry thread only ever walks the slots that are due:
+    O(expired) per tick rather than O(viewers). Count changes are coalesced
+    and reported through on_change(stream_id, counts) at most once per tick.
+    Streams must be registered with open(); heartbeats for unknown or dropped
+    streams are ignored, so a late one cannot resurrect an ended stream.
+    """
+
+    def __init__(self, on_change=None, ttl=30, resolution=1.0):
+        self.on_change = on_change
+        self.resolution = resolution
+        self._ttl_ticks = max(1, int(round(ttl / resolution)))
+        self._slots = [set() for _ in range(self._ttl_ticks + 2)]
+        self._epoch = time.monotonic()
+        self._tick = 0
+        self._lock = threading.Lock()
+        self._streams = {}      # stream_id -> _StreamPresence
+        self._dirty = set()
+        self._thread = None
+
+    def _now(self):
+        return int((time.monotonic() - self._epoch) / self.resolution)
+
+    def open(self, stream_id):
+        with self._lock:
+            if stream_id not in self._streams:
+                self._streams[stream_id] = _StreamPresence()
+
+    def heartbeat(self, stream_id, viewer_id):
+        """Mark viewer_id as watching stream_id; returns the current count, or None if not open."""
+        with self._lock:
+            stream = self._streams.get(stream_id)
+            if stream is None:
+                return None
+            deadline = self._now() + self._ttl_ticks
+            previous = stream.viewers.get(viewer_id)
+            if previous is None:
+                stream.joins += 1
+                self._dirty.add(stream_id)
+            elif previous != deadline:
+                self._slots[previous % len(self._slots)].discard((stream_id, viewer_id))
+            stream.viewers[viewer_id] = deadline
+            self._slots[deadline % len(self._slots)].add((stream_id, viewer_id))
+            stream.peak = max(stream.peak, len(stream.viewers))
+            return len(stream.viewers)
+
+    def leave(self, stream_id, viewer_id):
+        with self._lock:
+            stream = self._streams.get(stream_id)
+            deadline = stream.viewers.pop(viewer_id, None) if stream else None
+            if deadline is not None:
+                self._slots[deadline % len(self._slots)].discard((stream_id, viewer_id))
+                self._dirty.add(stream_id)
+
+    def counts(self, stream_id):
+        with self._lock:
+            stream = self._streams.get(stream_id)
+            if stream is None:
+                return {'viewers': 0, 'peak_viewers': 0}
+            return {'viewers': len(stream.viewers), 'peak_viewers': stream.peak}
+
+    def drop(self, stream_id):
+        """Forget a stream; returns its final counts plus total joins."""
+        with self._lock:
+            stream = self._streams.pop(stream_id, None)
+            self._dirty.discard(stream_id)
+            if stream is None:
+                return {'viewers': 0, 'peak_viewers': 0, 'joins': 0}
+            for viewer_id, deadline in stream.viewers.items():
+                self._slots[deadline % len(self._slots)].discard((stream_id, viewer_id))
+            return {'viewers': len(stream.viewers), 'peak_viewers': stream.peak,
+                    'joins': stream.joins}
+
+    def expire(self):
+        """Advance the wheel to now and return the streams whose count changed."""
+        with self._lock:
+            now = self._now()
+            # After a stall, one lap of the wheel covers every slot
+            for tick in range(max(self._tick + 1, now - len(self._slots) + 1), now + 1):
+                slot = self._slots[tick % len(self._slots)]
+                due = [key for key in slot if self._streams[key[0]].viewers[key[1]] <= now]
+                for key in due:
+                    slot.discard(key)
+                    del self._streams[key[0]].viewers[key[1]]
+                    self._dirty.add(key[0])
+            self._tick = max(self._tick, now)
+            changed, self._dirty = self._dirty, set()
+            return {stream_id: {'viewers': len(self._streams[stream_id].viewers),
+                                'peak_viewers': self._streams[stream_id].peak}
+                    for stream_id in changed if stream_id in self._streams}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='presence-expiry', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.resolution)
+            try:
+                changed = self.expire()
+                if self.on_change:
+                    for stream_id, counts in changed.items():
+                        self.on_change(stream_id, counts)
+            except Exception as e:
+                print(f"Presence expiry error: {e}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'streams': len(self._streams),
+                'viewers': sum(len(s.viewers) for s in self._streams.values())
+            }
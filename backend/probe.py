@@ -0,0 +1,280 @@
+import os
+import queue
+import struct
+import threading
+
+# Never read more than this much of a header box/element into memory
+MAX_HEADER_BYTES = 16 * 1024 * 1024
+
+
+class ProbeError(Exception):
+    pass
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f'{hours}:{minutes:02d}:{secs:02d}'
+    return f'{minutes}:{secs:02d}'
+
+
+# ============ MP4 / MOV ============
+def _iter_boxes(data, start=0, end=None):
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _find_moov(f, file_size):
+    pos = 0
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8:
+            break
+        size, box_type = struct.unpack_from('>I4s', header)
+        header_len = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', header, 8)[0]
+            header_len = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header_len:
+            break
+        if box_type == b'moov':
+            if size > MAX_HEADER_BYTES:
+                raise ProbeError('moov box too large')
+            f.seek(pos + header_len)
+            return f.read(size - header_len)
+        # Skip mdat and friends without reading them
+        pos += size
+    raise ProbeError('No moov box')
+
+
+def probe_mp4(f, file_size):
+    moov = _find_moov(f, file_size)
+    info = {}
+    width = height = 0
+    for box_type, start, end in _iter_boxes(moov):
+        if box_type == b'mvhd':
+            version = moov[start]
+            if version == 1:
+                timescale, duration = struct.unpack_from('>IQ', moov, start + 20)
+            else:
+                timescale, duration = struct.unpack_from('>II', moov, start + 12)
+            if timescale:
+                info['duration_seconds'] = duration / timescale
+        elif box_type == b'trak':
+            for child_type, child_start, _ in _iter_boxes(moov, start, end):
+                if child_type != b'tkhd':
+                    continue
+                offset = child_start + (88 if moov[child_start] == 1 else 76)
+                w, h = struct.unpack_from('>II', moov, offset)
+                # 16.16 fixed point; audio tracks report 0x0
+                if (w >> 16) * (h >> 16) > width * height:
+                    width, height = w >> 16, h >> 16
+    if width:
+        info['width'], info['height'] = width, height
+    return info
+
+
+# ============ WebM / Matroska (EBML) ============
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+INFO = 0x1549A966
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+VIDEO = 0xE0
+CLUSTER = 0x1F43B675
+CUES = 0x1C53BB6B
+CHAPTERS = 0x1043A770
+TAGS = 0x1254C367
+ATTACHMENTS = 0x1941A469
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+
+# Children of Segment; one of these ends any unknown-size element inside it
+TOP_LEVEL = frozenset((SEEK_HEAD, INFO, TRACKS, CLUSTER, CUES, CHAPTERS, TAGS, ATTACHMENTS))
+# Only master elements may have an unknown size
+MASTERS = TOP_LEVEL | {TRACK_ENTRY, VIDEO}
+
+
+def _read_vint(f, keep_marker):
+    first = f.read(1)
+    if not first:
+        raise EOFError
+    byte = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not byte & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ProbeError('Invalid EBML length')
+    value = byte if keep_marker else byte & (mask - 1)
+    rest = f.read(length - 1)
+    if len(rest) != length - 1:
+        raise EOFError
+    unknown = not keep_marker and value == mask - 1
+    for b in rest:
+        value = (value << 8) | b
+        unknown = unknown and b == 0xFF
+    return value, (None if unknown else value)
+
+
+def _read_element(f):
+    element_id, _ = _read_vint(f, keep_marker=True)
+    _, size = _read_vint(f, keep_marker=False)
+    return element_id, size
+
+
+def _read_uint(f, size):
+    return int.from_bytes(f.read(size), 'big')
+
+
+def _children(f, end, stop_ids=frozenset()):
+    """Yield (id, size, data_end) for the elements from f.tell() up to end.
+
+    An unknown-size element (live-muxed files) extends to its parent's end,
+    or until an element in stop_ids, which cannot be its child, appears; f is
+    then left at that element. Known-size elements are skipped past once the
+    caller moves on, however much of them it read.
+    """
+    while f.tell() < end:
+        start = f.tell()
+        try:
+            element_id, size = _read_element(f)
+        except EOFError:
+            return
+        if element_id in stop_ids:
+            f.seek(start)
+            return
+        if size is None:
+            if element_id not in MASTERS:
+                raise ProbeError('Unknown size on a non-master element')
+            yield element_id, None, end
+            continue
+        data_end = f.tell() + size
+        yield element_id, size, data_end
+        f.seek(data_end)
+
+
+def probe_ebml(f, file_size):
+    element_id, size = _read_element(f)
+    if element_id != EBML_HEADER or size is None:
+        raise ProbeError('Not an EBML file')
+    f.seek(size, os.SEEK_CUR)
+
+    element_id, size = _read_element(f)
+    if element_id != SEGMENT:
+        raise ProbeError('No Segment element')
+    segment_end = f.tell() + size if size is not None else file_size
+
+    info = {}
+    timecode_scale = 1000000
+    duration = None
+    width = height = 0
+    for element_id, _, element_end in _children(f, segment_end):
+        # Header elements precede the first Cluster; nothing after it is needed
+        if element_id == CLUSTER:
+            break
+        if element_id == INFO:
+            for child_id, child_size, _ in _children(f, element_end, TOP_LEVEL):
+                if child_id == TIMECODE_SCALE:
+                    timecode_scale = _read_uint(f, child_size)
+                elif child_id == DURATION:
+                    fmt = '>f' if child_size == 4 else '>d'
+                    duration = struct.unpack(fmt, f.read(child_size))[0]
+        elif element_id == TRACKS:
+            for child_id, _, entry_end in _children(f, element_end, TOP_LEVEL):
+                if child_id != TRACK_ENTRY:
+                    continue
+                for field_id, _, video_end in _children(f, entry_end, TOP_LEVEL | {TRACK_ENTRY}):
+                    if field_id != VIDEO:
+                        continue
+                    for prop_id, prop_size, _ in _children(f, video_end, TOP_LEVEL | {TRACK_ENTRY}):
+                        if prop_id == PIXEL_WIDTH:
+                            width = max(width, _read_uint(f, prop_size))
+                        elif prop_id == PIXEL_HEIGHT:
+                            height = max(height, _read_uint(f, prop_size))
+
+    if duration is not None:
+        info['duration_seconds'] = duration * timecode_scale / 1e9
+    if width:
+        info['width'], info['height'] = width, height
+    return info
+
+
+def probe_file(path):
+    """Read container headers of path and return duration, dimensions and bitrate."""
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        magic = f.read(12)
+        f.seek(0)
+        if magic[:4] == b'\x1a\x45\xdf\xa3':
+            info = probe_ebml(f, file_size)
+        elif magic[4:8] in (b'ftyp', b'moov', b'mdat', b'free', b'wide', b'skip'):
+            info = probe_mp4(f, file_size)
+        else:
+            raise ProbeError('Unsupported container')
+
+    seconds = info.get('duration_seconds')
+    if seconds:
+        info['duration'] = format_duration(seconds)
+        info['bitrate'] = int(file_size * 8 / seconds)
+    return info
+
+
+class ProbeQueue:
+    """Bounded work queue drained by a small pool of probe threads."""
+
+    def __init__(self, on_result, workers=2, maxsize=256):
+        self.on_result = on_result
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._run, name=f'probe-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, video_id, path):
+        """Queue path for probing; returns False instead of blocking when full."""
+        try:
+            self._queue.put_nowait((video_id, path))
+            return True
+        except queue.Full:
+            print(f"Probe queue full, skipping {video_id}")
+            return False
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            video_id, path = self._queue.get()
+            try:
+                info = probe_file(path)
+                if info:
+                    self.on_result(video_id, info)
+            except (ProbeError, OSError, EOFError, struct.error, IndexError) as e:
+                print(f"Probe failed for {video_id}: {e}")
+            except Exception as e:
+                print(f"Probe error for {video_id}: {e}")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,95 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+
+try:
+    from eventlet import patcher, tpool
+except ImportError:
+    tpool = None
+
+
+def _monkey_patched():
+    return tpool is not None and patcher.is_monkey_patched('thread')
+
+
+class FileReclaimer:
+    """Deletes files on a background thread, retrying failures with backoff.
+
+    Under eventlet's monkey patching (gunicorn's eventlet worker) that thread
+    is a green thread, and unlinking a large file would block the whole hub,
+    so the unlink itself runs on a native thread through eventlet.tpool.
+    """
+
+    def __init__(self, max_attempts=8, base_delay=1.0, max_delay=60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._heap = []     # (due, seq, path, size, attempts)
+        self._seq = itertools.count()
+        self.pending_bytes = 0
+        self.reclaimed_bytes = 0
+        self.failed = 0
+        self.green = _monkey_patched()
+        self._thread = threading.Thread(target=self._run, name='file-reclaimer', daemon=True)
+        self._thread.start()
+
+    def submit(self, path, size=None):
+        if not path:
+            return
+        if size is None:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic(), next(self._seq), path, size, 0))
+            self.pending_bytes += size
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    self._cond.wait(self._heap[0][0] - now if self._heap else None)
+                _, _, path, size, attempts = heapq.heappop(self._heap)
+
+            try:
+                self._unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                attempts += 1
+                with self._cond:
+                    if attempts < self.max_attempts:
+                        delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+                        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), path, size, attempts))
+                        continue
+                    self.failed += 1
+                    self.pending_bytes -= size
+                print(f"Giving up deleting {path} after {attempts} attempts: {e}")
+                continue
+
+            with self._cond:
+                self.pending_bytes -= size
+                self.reclaimed_bytes += size
+
+    def _unlink(self, path):
+        if self.green:
+            tpool.execute(os.remove, path)
+        else:
+            os.remove(path)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'pending_files': len(self._heap),
+                'pending_bytes': self.pending_bytes,
+                'reclaimed_bytes': self.reclaimed_bytes,
+                'failed': self.failed
+            }
@@ -0,0 +1,228 @@
+import os
+import queue
+import threading
+import time
+import cv2
+
+# Codecs to try for recordings, in order: (fourcc, container, plays in browsers).
+# H.264 needs an encoder OpenCV may not ship with; VP8/WebM is the usual
+# browser-playable fallback; MPEG-4 part 2 is always available but browsers
+# won't play it in <video>.
+CODECS = (
+    ('avc1', '.mp4', True),
+    ('VP80', '.webm', True),
+    ('mp4v', '.mp4', False),
+)
+SEGMENT_SECONDS = 60
+
+
+def open_writer(base, fps, size, codecs=CODECS):
+    """Return (writer, codec, path) for the first codec that opens, or (None, None, None).
+
+    path is base plus the codec's container extension.
+    """
+    for codec in codecs:
+        path = base + codec[1]
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*codec[0]), fps, size)
+        if writer.isOpened():
+            return writer, codec, path
+        writer.release()
+        if os.path.exists(path):
+            os.remove(path)
+    return None, None, None
+
+
+class Recorder:
+    """Writes one stream's frames to disk on its own thread.
+
+    The capture thread hands frames to offer(), which only ever does a
+    put_nowait() on a bounded queue: when the disk falls behind, frames are
+    dropped and counted instead of stalling capture. Frames are written to
+    rolling segment files of segment_seconds each, so a crash loses at most
+    the open segment. Frames are stamped on arrival and placed on a 1/fps
+    schedule: a slow camera or dropped frames repeat the previous frame, and
+    frames arriving faster than fps are skipped, so playback runs at wall-clock
+    speed. stop() lets the queue drain, then joins the segments
+    into <name>.mp4 (or .webm) and calls on_finished(path, info) from the
+    recorder thread, also after an error (path is None if nothing could be
+    recorded).
+    """
+
+    def __init__(self, folder, name, fps, segment_seconds=SEGMENT_SECONDS,
+                 max_queue=None, on_finished=None):
+        self.folder = folder
+        self.name = name
+        self.fps = fps
+        self.segment_frames = max(1, int(segment_seconds * fps))
+        self.on_finished = on_finished
+        self._queue = queue.Queue(max_queue or fps * 2)
+        self._stopping = threading.Event()
+        self.segments = []
+        self.codec = None
+        self.size = None
+        self.path = None
+        self.written = 0
+        self.dropped = 0
+        self.repeated = 0
+        self.skipped = 0
+        self.first_time = None
+        self.last_time = None
+        self.status = 'recording'
+        os.makedirs(folder, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name=f'recorder-{name}', daemon=True)
+        self._thread.start()
+
+    def offer(self, frame, timestamp=None):
+        if self._stopping.is_set():
+            return
+        try:
+            self._queue.put_nowait((time.monotonic() if timestamp is None else timestamp, frame))
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        self._stopping.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            self._record()
+        except Exception as e:
+            print(f"❌ Recording error for {self.name}: {e}")
+        finally:
+            self._finish()
+
+    def _record(self):
+        self._writer = None
+        self._count = 0
+        previous = None
+        try:
+            while True:
+                try:
+                    timestamp, frame = self._queue.get(timeout=0.5)
+                except queue.Empty:
+                    if self._stopping.is_set():
+                        break
+                    continue
+
+                if self.size is None:
+                    self.size = (frame.shape[1], frame.shape[0])
+                if (frame.shape[1], frame.shape[0]) != self.size:
+                    frame = cv2.resize(frame, self.size)
+                if self.first_time is None:
+                    self.first_time = timestamp
+
+                # Output frame index this frame belongs at on the 1/fps schedule
+                slot = int(round((timestamp - self.first_time) * self.fps))
+                if slot < self.written:
+                    self.skipped += 1
+                    continue
+                while self.written < slot:
+                    if not self._write(previous):
+                        return
+                    self.repeated += 1
+                if not self._write(frame):
+                    return
+                previous = frame
+                self.last_time = timestamp
+        finally:
+            if self._writer is not None:
+                self._writer.release()
+
+    def _write(self, frame):
+        if self._writer is None or self._count >= self.segment_frames:
+            if self._writer is not None:
+                self._writer.release()
+            self._writer = self._open_segment()
+            self._count = 0
+            if self._writer is None:
+                return False
+        self._writer.write(frame)
+        self._count += 1
+        self.written += 1
+        return True
+
+    def _finish(self):
+        # Always runs, so a recording never stays 'recording' after an error
+        try:
+            self.status = 'finalizing'
+            self.path = self._finalize()
+        except Exception as e:
+            print(f"❌ Recording finalize error for {self.name}: {e}")
+        self.status = 'ready' if self.path else 'failed'
+        if self.path and not self.browser_playable:
+            print(f"⚠️  Recording {self.path} uses {self.codec[0]}, which browsers cannot play")
+        if self.on_finished:
+            self.on_finished(self.path, self.stats())
+
+    @property
+    def duration(self):
+        # Wall-clock span of the recorded frames, the last one shown for 1/fps
+        if self.last_time is None:
+            return 0.0
+        return self.last_time - self.first_time + 1 / self.fps
+
+    @property
+    def browser_playable(self):
+        return bool(self.codec and self.codec[2])
+
+    def _open_segment(self):
+        base = os.path.join(self.folder, f'{self.name}.part{len(self.segments):04d}')
+        writer, codec, path = open_writer(base, self.fps, self.size, (self.codec,) if self.codec else CODECS)
+        if writer is None:
+            print(f"❌ Could not open a video writer for {base}")
+            return None
+        self.codec = codec
+        self.segments.append(path)
+        return writer
+
+    def _finalize(self):
+        """Join the segments into one file and remove them; returns its path."""
+        if not self.written:
+            for segment in self.segments:
+                os.remove(segment)
+            return None
+
+        base = os.path.join(self.folder, self.name)
+        if len(self.segments) == 1:
+            path = base + self.codec[1]
+            os.replace(self.segments[0], path)
+            return path
+
+        # OpenCV cannot copy streams between containers, so the segments are
+        # decoded and written out again; this runs after the stream has ended
+        writer, _, path = open_writer(base, self.fps, self.size, (self.codec,))
+        if writer is None:
+            return None
+        try:
+            for segment in self.segments:
+                source = cv2.VideoCapture(segment)
+                try:
+                    while True:
+                        ok, frame = source.read()
+                        if not ok:
+                            break
+                        writer.write(frame)
+                finally:
+                    source.release()
+        finally:
+            writer.release()
+        for segment in self.segments:
+            os.remove(segment)
+        return path
+
+    def stats(self):
+        return {
+            'status': self.status,
+            'codec': self.codec[0] if self.codec else None,
+            'browser_playable': self.browser_playable,
+            'segments': len(self.segments),
+            'written': self.written,
+            'dropped': self.dropped,
+            'repeated': self.repeated,
+            'skipped': self.skipped,
+            'queued': self._queue.qsize(),
+            'seconds': round(self.duration, 1)
+        }
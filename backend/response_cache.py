@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import Response, request
+from fragments import encode
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+
+class CachedBody:
+    __slots__ = ('version', 'etag', 'encodings')
+
+    def __init__(self, version, body):
+        self.version = version
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.encodings = {'identity': body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            self.encodings['gzip'] = gzip.compress(body, 6)
+            if brotli is not None:
+                self.encodings['br'] = brotli.compress(body, quality=5)
+
+
+class ResponseCache:
+    """JSON responses rendered once per data version and stored precompressed.
+
+    Callers pass the current version of whatever the response is built from;
+    a cached body is served only while that version is unchanged, so writers
+    invalidate simply by bumping a counter. Entries are kept in LRU order.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> CachedBody
+        self._versions = {}             # named counters for collections without their own
+        self.hits = 0
+        self.misses = 0
+
+    def bump(self, name):
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def version(self, name):
+        return self._versions.get(name, 0)
+
+    def lookup(self, key, version, render):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Rendered outside the lock; concurrent misses may both render, which is harmless.
+        # render() may return ready-made JSON bytes (see FragmentCache).
+        body = render()
+        if not isinstance(body, bytes):
+            body = encode(body)
+        entry = CachedBody(version, body)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, key, version, render):
+        """Serve render()'s JSON for the current request, from cache when possible."""
+        entry = self.lookup(key, version, render)
+        accepted = request.accept_encodings
+        encoding = next((e for e in ('br', 'gzip') if e in entry.encodings and accepted[e]), 'identity')
+
+        # A strong ETag names exact bytes, so each content-coding gets its own
+        etag = entry.etag if encoding == 'identity' else f'{entry.etag[:-1]}-{encoding}"'
+        headers = {'ETag': etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+        if etag in request.headers.get('If-None-Match', ''):
+            return Response(status=304, headers=headers)
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(entry.encodings[encoding], mimetype='application/json', headers=headers)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'bytes': sum(sum(len(b) for b in e.encodings.values()) for e in self._entries.values())
+            }
@@ -0,0 +1,145 @@
+import re
+import math
+import heapq
+import threading
+from bisect import bisect_left, insort
+from itertools import islice
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Field boosts: a title match outweighs a creator match, which outweighs the description
+FIELD_WEIGHTS = {'title': 3.0, 'creator_name': 2.0, 'description': 1.0}
+
+# Upper bound on vocabulary terms a typeahead prefix expands to
+MAX_PREFIX_TERMS = 16
+
+# Postings walked per query token; terms common enough to exceed this only
+# re-score candidates found through rarer tokens (or their newest entries)
+MAX_POSTINGS_SCAN = 2000
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """Incrementally maintained inverted index with BM25 ranking and prefix search.
+
+    Fields are folded into one weighted bag of words per video (BM25F-style),
+    and the last query token is treated as a prefix so partial input matches.
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings = {}     # term -> {video_id: weighted term frequency}
+        self._doc_terms = {}    # video_id -> terms, for removal
+        self._doc_len = {}      # video_id -> weighted length
+        self._total_len = 0.0
+        self._vocabulary = []   # sorted terms, for prefix expansion
+
+    def add(self, video):
+        video_id = video['id']
+        weights = {}
+        for field, boost in FIELD_WEIGHTS.items():
+            for term in tokenize(video.get(field)):
+                weights[term] = weights.get(term, 0.0) + boost
+        length = sum(weights.values())
+
+        with self._lock:
+            self._remove(video_id)
+            for term, weight in weights.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    insort(self._vocabulary, term)
+                postings[video_id] = weight
+            self._doc_terms[video_id] = list(weights)
+            self._doc_len[video_id] = length
+            self._total_len += length
+
+    def remove(self, video_id):
+        with self._lock:
+            self._remove(video_id)
+
+    def _remove(self, video_id):
+        terms = self._doc_terms.pop(video_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(video_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[video_id]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+
+    def _expand(self, prefix, limit=MAX_PREFIX_TERMS):
+        start = bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + limit]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query, limit=20):
+        """Return [(video_id, score)] best first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_len)
+            if not doc_count:
+                return []
+            avg_len = self._total_len / doc_count
+
+            # Typeahead: the token being typed matches as a prefix
+            groups = []
+            for i, token in enumerate(tokens):
+                terms = self._expand(token) if i == len(tokens) - 1 else [token]
+                postings = [self._postings[t] for t in terms if t in self._postings]
+                if postings:
+                    groups.append(postings)
+            # Rarest tokens first, so they pick the candidates
+            groups.sort(key=lambda group: sum(len(p) for p in group))
+
+            scores = {}
+            for group in groups:
+                token_scores = {}
+                selective = sum(len(p) for p in group) <= MAX_POSTINGS_SCAN
+                budget = None if selective else MAX_POSTINGS_SCAN // len(group)
+                for postings in group:
+                    idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    if selective or not scores:
+                        # Newest videos first when a common term has to be truncated
+                        entries = islice(((vid, postings[vid]) for vid in reversed(postings)),
+                                         budget)
+                    else:
+                        entries = ((vid, postings[vid]) for vid in scores if vid in postings)
+                    for video_id, tf in entries:
+                        norm = self.k1 * (1 - self.b + self.b * self._doc_len[video_id] / avg_len)
+                        score = idf * tf * (self.k1 + 1) / (tf + norm)
+                        # Several expansions of one prefix count once, at their best
+                        if score > token_scores.get(video_id, 0.0):
+                            token_scores[video_id] = score
+                for video_id, score in token_scores.items():
+                    scores[video_id] = scores.get(video_id, 0.0) + score
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def suggest(self, prefix, limit=10):
+        """Complete the last word of prefix with the most common matching terms."""
+        tokens = tokenize(prefix)
+        if not tokens:
+            return []
+        with self._lock:
+            terms = self._expand(tokens[-1])
+            ranked = heapq.nlargest(limit, terms, key=lambda term: len(self._postings[term]))
+        head = ' '.join(tokens[:-1])
+        return [f'{head} {term}' if head else term for term in ranked]
+
+    def __len__(self):
+        return len(self._doc_len)
@@ -0,0 +1,143 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+THUMBNAIL_WIDTH = 320
+FORMATS = {
+    'jpg': ('.jpg', 'image/jpeg'),
+    'webp': ('.webp', 'image/webp'),
+}
+
+
+def render_poster(path, width=THUMBNAIL_WIDTH):
+    """Decode a poster frame from path and return {'jpg': bytes, 'webp': bytes}.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+        # Skip intros/black leaders: take the frame 10% in when the length is known
+        if frame_count > 0:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, int(frame_count * 0.1))
+        ok, frame = capture.read()
+        if not ok:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = capture.read()
+        if not ok:
+            return None
+    finally:
+        capture.release()
+
+    height = int(frame.shape[0] * width / frame.shape[1])
+    frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+    images = {}
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    if ok:
+        images['jpg'] = buffer.tobytes()
+    ok, buffer = cv2.imencode('.webp', frame, [cv2.IMWRITE_WEBP_QUALITY, 75])
+    if ok:
+        images['webp'] = buffer.tobytes()
+    return images
+
+
+class ThumbnailCache:
+    """Content-addressed thumbnail store: files on disk keyed by SHA-256, hot entries in an LRU."""
+
+    def __init__(self, folder, memory_bytes=32 * 1024 * 1024):
+        self.folder = folder
+        self.memory_bytes = memory_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()    # (digest, fmt) -> bytes, least recently used first
+        self._memory_size = 0
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, digest, fmt):
+        return os.path.join(self.folder, digest[:2], digest + FORMATS[fmt][0])
+
+    def put(self, data, fmt):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest, fmt)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        self._remember((digest, fmt), data)
+        return digest
+
+    def get(self, digest, fmt):
+        # Keyed by format too: a digest only names the bytes stored under it,
+        # so <digest>.webp must not be answered with a cached JPEG
+        key = (digest, fmt)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+        try:
+            with open(self._path(digest, fmt), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def _remember(self, key, data):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = data
+            self._memory_size += len(data)
+            while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+
+class PosterGenerator:
+    """Renders poster frames in a process pool and stores them in a ThumbnailCache."""
+
+    def __init__(self, cache, on_result, workers=2):
+        self.cache = cache
+        self.on_result = on_result
+        self.workers = workers
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def available(self):
+        return cv2 is not None
+
+    def submit(self, video_id, path):
+        if not self.available:
+            return False
+        # Created lazily so importing the app never forks worker processes;
+        # the lock keeps concurrent first uploads from each creating one
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            pool = self._pool
+        future = pool.submit(render_poster, path)
+        future.add_done_callback(lambda f: self._store(video_id, f))
+        return True
+
+    def _store(self, video_id, future):
+        try:
+            images = future.result()
+        except Exception as e:
+            print(f"Thumbnail generation failed for {video_id}: {e}")
+            return
+        if not images:
+            return
+        digests = {fmt: self.cache.put(data, fmt) for fmt, data in images.items()}
+        self.on_result(video_id, digests)
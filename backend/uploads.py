@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+from datetime import datetime
+
+READ_SIZE = 1024 * 1024
+# Session metadata is kept next to the partial file as <file><SESSION_SUFFIX>
+SESSION_SUFFIX = '.upload.json'
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class UploadSessions:
+    """Resumable chunked uploads written in place to their final file.
+
+    A session preallocates its target file, accepts chunks only at the current
+    offset (so a retry after a dropped connection simply resumes), and is
+    discarded together with its partial file once idle for longer than ttl.
+    Each session's state is saved beside its partial file, so uploads can be
+    resumed after a restart and stale partials are swept when loading.
+    """
+
+    def __init__(self, folder, max_size, ttl=24 * 3600):
+        self.folder = folder
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._last_sweep = 0
+        self.load()
+
+    def load(self):
+        """Restore sessions saved by a previous process, discarding stale ones."""
+        if not os.path.isdir(self.folder):
+            return
+        now = time.time()
+        for name in os.listdir(self.folder):
+            if not name.endswith(SESSION_SUFFIX):
+                continue
+            try:
+                with open(os.path.join(self.folder, name)) as f:
+                    session = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable upload session {name}: {e}")
+                continue
+            session['lock'] = threading.Lock()
+            if now - session['updated_at'] > self.ttl or not os.path.exists(session['filepath']):
+                self._discard(session)
+                continue
+            self._sessions[session['id']] = session
+
+    def create(self, filename, size, metadata=None):
+        if not isinstance(size, int) or size <= 0:
+            raise UploadError('Upload size required')
+        if size > self.max_size:
+            raise UploadError('File too large', status=413)
+
+        self.expire()
+        upload_id = str(uuid.uuid4())
+        stored_name = f"{upload_id}_{filename}"
+        session = {
+            'id': upload_id,
+            'filename': stored_name,
+            'filepath': os.path.join(self.folder, stored_name),
+            'size': size,
+            'offset': 0,
+            'metadata': metadata or {},
+            'updated_at': time.time(),
+            'lock': threading.Lock()
+        }
+        # Reserve the full length up front so chunks land at their final position
+        with open(session['filepath'], 'wb') as f:
+            f.truncate(size)
+        self._save(session)
+
+        with self._lock:
+            self._sessions[upload_id] = session
+        return session
+
+    def get(self, upload_id):
+        self.expire()
+        session = self._sessions.get(upload_id)
+        if session is None:
+            raise UploadError('Upload not found', status=404)
+        return session
+
+    def write_chunk(self, upload_id, offset, stream, length, checksum=None):
+        """Write length bytes from stream at offset and return the new offset.
+
+        checksum, if given, is the hex SHA-256 of the chunk; on mismatch the
+        offset is not advanced so the client can resend the same chunk.
+        """
+        session = self.get(upload_id)
+        with session['lock']:
+            if offset != session['offset']:
+                raise UploadError('Offset mismatch', status=409, offset=session['offset'])
+            if length is None or length <= 0:
+                raise UploadError('Chunk length required', status=411)
+            if offset + length > session['size']:
+                raise UploadError('Chunk exceeds upload size', status=413)
+
+            digest = hashlib.sha256()
+            received = 0
+            fd = os.open(session['filepath'], os.O_WRONLY)
+            try:
+                while received < length:
+                    data = stream.read(min(READ_SIZE, length - received))
+                    if not data:
+                        break
+                    os.pwrite(fd, data, offset + received)
+                    digest.update(data)
+                    received += len(data)
+                # The saved offset must never run ahead of data on disk
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+            session['updated_at'] = time.time()
+            if received != length:
+                raise UploadError('Incomplete chunk', offset=session['offset'])
+            if checksum and digest.hexdigest() != checksum.lower():
+                raise UploadError('Checksum mismatch', status=422, offset=session['offset'])
+
+            session['offset'] = offset + length
+            self._save(session)
+            return session['offset']
+
+    def finish(self, upload_id):
+        session = self.get(upload_id)
+        with session['lock']:
+            if session['offset'] != session['size']:
+                raise UploadError('Upload incomplete', status=409, offset=session['offset'])
+            # Only one of several concurrent completes may claim the session
+            with self._lock:
+                if self._sessions.get(upload_id) is not session:
+                    raise UploadError('Upload not found', status=404)
+                del self._sessions[upload_id]
+            self._remove(self._session_path(session))
+        return session
+
+    def abort(self, upload_id):
+        with self._lock:
+            session = self._sessions.pop(upload_id, None)
+        if session is None:
+            raise UploadError('Upload not found', status=404)
+        self._discard(session)
+
+    def expire(self):
+        now = time.time()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+
+        with self._lock:
+            stale = [s for s in self._sessions.values() if now - s['updated_at'] > self.ttl]
+            for session in stale:
+                del self._sessions[session['id']]
+        for session in stale:
+            self._discard(session)
+
+    def _session_path(self, session):
+        return session['filepath'] + SESSION_SUFFIX
+
+    def _save(self, session):
+        path = self._session_path(session)
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({k: v for k, v in session.items() if k != 'lock'}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error saving upload session: {e}")
+
+    def _discard(self, session):
+        self._remove(session['filepath'])
+        self._remove(self._session_path(session))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error removing partial upload: {e}")
+
+    def describe(self, session):
+        return {
+            'upload_id': session['id'],
+            'offset': session['offset'],
+            'size': session['size'],
+            'expires_at': datetime.fromtimestamp(session['updated_at'] + self.ttl).isoformat()
+        }
@@ -4,6 +4,7 @@ import uuid
 from datetime import datetime
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
+from catalog import EngagementCounters
 
 app = Flask(__name__)
 app.secret_key = 'video-platform-key'
@@ -14,6 +15,7 @@ users = {'admin': 'admin123', 'creator1': 'pass123'}
 videos = []
 comments = []
 likes = []
+counters = EngagementCounters()
 
 @app.route('/')
 def index():
@@ -54,12 +56,7 @@ def register():
 # Video Management
 @app.route('/api/videos', methods=['GET'])
 def get_videos():
-    return jsonify([{
-        **video,
-        'likes': len([l for l in likes if l['video_id'] == video['id'] and l['type'] == 'like']),
-        'dislikes': len([l for l in likes if l['video_id'] == video['id'] and l['type'] == 'dislike']),
-        'comments_count': len([c for c in comments if c['video_id'] == video['id']])
-    } for video in videos])
+    return jsonify([{**video, **counters.get(video['id'])} for video in videos])
 
 @app.route('/api/videos/<video_id>', methods=['GET'])
 def get_video(video_id):
@@ -68,13 +65,12 @@ def get_video(video_id):
         return jsonify({'error': 'Video not found'}), 404
     
     video_comments = [c for c in comments if c['video_id'] == video_id]
-    video_likes = len([l for l in likes if l['video_id'] == video_id and l['type'] == 'like'])
-    video_dislikes = len([l for l in likes if l['video_id'] == video_id and l['type'] == 'dislike'])
+    counts = counters.get(video_id)
     
     return jsonify({
         **video,
-        'likes': video_likes,
-        'dislikes': video_dislikes,
+        'likes': counts['likes'],
+        'dislikes': counts['dislikes'],
         'comments': video_comments
     })
 
@@ -118,7 +114,11 @@ def like_video(video_id):
     
     # Remove existing like/dislike
     global likes
-    likes = [l for l in likes if not (l['video_id'] == video_id and l['user_id'] == user_id)]
+    previous = next((l for l in likes if l['video_id'] == video_id and l['user_id'] == user_id), None)
+    if previous:
+        likes = [l for l in likes if l is not previous]
+        counters.add_reaction(video_id, previous['type'], -1)
+    counters.add_reaction(video_id, like_type)
     
     # Add new like/dislike
     likes.append({
@@ -145,16 +145,21 @@ def add_comment(video_id):
     }
     
     comments.append(comment)
+    counters.add(video_id, 'comments_count')
     return jsonify(comment)
 
 @app.route('/api/videos/<video_id>/comments/<comment_id>', methods=['DELETE'])
 def delete_comment(video_id, comment_id):
     global comments
-    comments = [c for c in comments if c['id'] != comment_id]
+    comment = next((c for c in comments if c['id'] == comment_id), None)
+    if comment:
+        comments = [c for c in comments if c is not comment]
+        counters.add(comment['video_id'], 'comments_count', -1)
     return jsonify({'message': 'Comment deleted'})
 
 @app.route('/api/videos/<video_id>', methods=['DELETE'])
 def delete_video(video_id):
+    global videos, comments, likes
     data = request.get_json()
     user_id = data.get('user_id')
     
@@ -166,10 +171,10 @@ def delete_video(video_id):
     if video['creator_id'] != user_id and user_id != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    global videos, comments, likes
     videos = [v for v in videos if v['id'] != video_id]
     comments = [c for c in comments if c['video_id'] != video_id]
     likes = [l for l in likes if l['video_id'] != video_id]
+    counters.drop(video_id)
     
     return jsonify({'message': 'Video deleted successfully'})
 
@@ -0,0 +1,134 @@
+import math
+import time
+import hashlib
+import threading
+
+
+class RotatingBloomFilter:
+    """Two-generation Bloom filter: remembers keys for between one and two windows."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.bits = bits
+        self.hashes = max(1, round(bits / capacity * math.log(2)))
+        self._current = bytearray((bits + 7) // 8)
+        self._previous = bytearray((bits + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def check_and_add(self, key):
+        """Add key and return True if it was (probably) already present."""
+        positions = self._positions(key)
+        current, previous = self._current, self._previous
+        seen_current = all(current[p >> 3] & (1 << (p & 7)) for p in positions)
+        if seen_current:
+            return True
+        seen_previous = all(previous[p >> 3] & (1 << (p & 7)) for p in positions)
+        for p in positions:
+            current[p >> 3] |= 1 << (p & 7)
+        return seen_previous
+
+    def rotate(self):
+        self._previous = self._current
+        self._current = bytearray(len(self._previous))
+
+    @property
+    def memory_bytes(self):
+        return len(self._current) + len(self._previous)
+
+
+class _Stripe:
+    __slots__ = ('lock', 'pending')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}   # video_id -> views not yet flushed
+
+
+class ViewCounter:
+    """Striped view counters merged on a timer, with windowed per-client dedup.
+
+    record() touches one of a fixed number of stripes, picked by thread, under
+    that stripe's own lock, so request threads rarely contend. A flusher thread
+    swaps out each stripe's pending counts every flush_interval seconds and
+    hands the merged deltas to on_flush. Repeat views of a video by the same
+    client within dedup_window seconds are dropped using striped Bloom filters.
+    """
+
+    def __init__(self, on_flush, flush_interval=1.0, dedup_window=1800, stripes=16,
+                 capacity=1000000):
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval
+        self.dedup_window = dedup_window
+        self._stripes = [_Stripe() for _ in range(stripes)]
+        self._filters = [(threading.Lock(), RotatingBloomFilter(capacity // stripes))
+                         for _ in range(stripes)]
+        self._last_rotate = time.monotonic()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self.counted = 0
+        self.deduplicated = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='view-flusher', daemon=True)
+        self._thread.start()
+
+    def record(self, video_id, client_key):
+        """Count a view of video_id by client_key; returns False if it was a repeat."""
+        key = f'{video_id}|{client_key}'
+        lock, bloom = self._filters[hash(key) % len(self._filters)]
+        with lock:
+            seen = bloom.check_and_add(key)
+        if seen:
+            self.deduplicated += 1
+            return False
+
+        # Thread idents are aligned addresses; mix the bits before picking a stripe
+        ident = threading.get_ident()
+        stripe = self._stripes[(ident ^ (ident >> 12) ^ (ident >> 20)) % len(self._stripes)]
+        with stripe.lock:
+            stripe.pending[video_id] = stripe.pending.get(video_id, 0) + 1
+        self.counted += 1
+        return True
+
+    def pending(self, video_id):
+        """Views recorded but not yet flushed; lock-free and approximate."""
+        return sum(stripe.pending.get(video_id, 0) for stripe in self._stripes)
+
+    def flush(self):
+        with self._flush_lock:
+            deltas = {}
+            for stripe in self._stripes:
+                with stripe.lock:
+                    pending = stripe.pending
+                    if not pending:
+                        continue
+                    stripe.pending = {}
+                for video_id, count in pending.items():
+                    deltas[video_id] = deltas.get(video_id, 0) + count
+            if deltas:
+                self.on_flush(deltas)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"View flush error: {e}")
+            if time.monotonic() - self._last_rotate >= self.dedup_window:
+                for lock, bloom in self._filters:
+                    with lock:
+                        bloom.rotate()
+                self._last_rotate = time.monotonic()
+
+    def stats(self):
+        return {
+            'counted': self.counted,
+            'deduplicated': self.deduplicated,
+            'dedup_memory_bytes': sum(bloom.memory_bytes for _, bloom in self._filters)
+        }
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from broadcast import FrameEncoder
+
+VIEWERS = [int(n) for n in os.environ.get('BENCH_VIEWERS', '1,10,100').split(',')]
+FPS = 30
+SECONDS = int(os.environ.get('BENCH_SECONDS', 2))
+
+stream = {'title': 'Benchmark stream', 'viewers': 0}
+rng = np.random.default_rng(1)
+base = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+# Smooth the noise so JPEG sizes resemble a camera picture
+base = cv2.GaussianBlur(base, (31, 31), 0)
+frames = [np.roll(base, i * 4, axis=1) for i in range(FPS * SECONDS)]
+
+
+def render(frame):
+    frame = frame.copy()
+    cv2.putText(frame, f"LIVE: {stream['title']}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+    cv2.putText(frame, f"Viewers: {stream['viewers']}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    return buffer if ret else None
+
+
+def per_viewer(viewers):
+    # The old generate_frames: overlay, encode and concatenate for every viewer
+    for frame in frames:
+        for _ in range(viewers):
+            buffer = render(frame)
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
+
+
+def shared(viewers):
+    encoder = FrameEncoder(render)
+    for seq, frame in enumerate(frames, 1):
+        for _ in range(viewers):
+            yield encoder.chunk(seq, frame)
+
+
+def measure(generate, viewers):
+    encodes = 0
+    allocated = 0
+    previous = None
+    started = time.process_time()
+    for chunk in generate(viewers):
+        # A chunk that isn't the one just sent is a buffer that had to be built
+        if chunk is not previous:
+            allocated += len(chunk)
+            encodes += 1
+        previous = chunk
+    cpu = time.process_time() - started
+    return cpu / SECONDS, encodes / SECONDS, allocated / SECONDS
+
+
+print(f"⏱️  {SECONDS}s of 640x480 @ {FPS} FPS, per second of video")
+print(f"   {'viewers':>7} {'':>10} {'CPU':>9} {'encodes/s':>10} {'MB/s built':>11}")
+for viewers in VIEWERS:
+    for name, generate in (('per-viewer', per_viewer), ('shared', shared)):
+        cpu, encodes, allocated = measure(generate, viewers)
+        print(f"   {viewers:>7} {name:>10} {cpu * 1000:>7.0f}ms {encodes:>10.0f} {allocated / 1e6:>11.1f}")
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from catalog import VideoCatalog, EngagementCounters, ReactionMap
+from journal import Journal
+
+VIDEOS = int(os.environ.get('BENCH_VIDEOS', 100_000))
+LIKES = int(os.environ.get('BENCH_LIKES', 1_000_000))
+TAIL_OPS = int(os.environ.get('BENCH_TAIL_OPS', 50_000))
+
+print(f"📦 Building snapshot: {VIDEOS} videos, {LIKES} likes, {TAIL_OPS} journal ops")
+folder = tempfile.mkdtemp()
+videos = [{
+    'id': f'v{i}',
+    'title': f'Video {i}',
+    'description': 'Benchmark video',
+    'creator_id': f'user{i % 1000}',
+    'creator_name': f'User {i % 1000}',
+    'thumbnail': f'/api/videos/v{i}/thumbnail',
+    'video_url': f'/api/videos/v{i}/stream',
+    'duration': 'Unknown',
+    'views': i,
+    'created_at': '2026-01-01T00:00:00',
+    'is_live': False
+} for i in range(VIDEOS)]
+likes = [{
+    'video_id': f'v{i % VIDEOS}',
+    'user_id': f'user{i // VIDEOS}',
+    'type': 'like' if i % 3 else 'dislike',
+    'created_at': '2026-01-01T00:00:00'
+} for i in range(LIKES)]
+
+with open(os.path.join(folder, 'snapshot.json'), 'w') as f:
+    json.dump({'journal': 1, 'state': {
+        'users': {}, 'videos': videos, 'comments': [], 'likes': likes, 'live_streams': {}
+    }}, f)
+with open(os.path.join(folder, 'journal-00000001.log'), 'w') as f:
+    for i in range(TAIL_OPS):
+        f.write(json.dumps(['video_update', [f'v{i % VIDEOS}', {'views': i}]]) + '\n')
+del videos, likes
+
+print(f"   Snapshot size: {os.path.getsize(os.path.join(folder, 'snapshot.json')) / 1e6:.1f} MB")
+
+# Same steps as app.restore_state()
+started = time.time()
+journal = Journal(folder)
+state, ops = journal.load()
+loaded = time.time()
+
+catalog = VideoCatalog()
+counters = EngagementCounters()
+reactions = ReactionMap(counters)
+catalog.extend(state['videos'])
+for reaction in state['likes']:
+    reactions.set(reaction['video_id'], reaction['user_id'], reaction)
+indexed = time.time()
+
+replayed = 0
+for op, args in ops:
+    video = catalog.get(args[0])
+    if video:
+        video.update(args[1])
+    replayed += 1
+finished = time.time()
+
+print(f"\n⏱️  Recovery of {len(catalog)} videos, {len(reactions)} likes, {replayed} ops")
+print(f"   Snapshot parse: {loaded - started:.2f}s")
+print(f"   Index rebuild:  {indexed - loaded:.2f}s")
+print(f"   Journal replay: {finished - indexed:.2f}s")
+print(f"   Total:          {finished - started:.2f}s")
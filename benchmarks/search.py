@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from search import SearchIndex
+
+VIDEOS = int(os.environ.get('BENCH_VIDEOS', 100_000))
+QUERIES = ['python', 'live coding', 'podcast tech', 'fla', 'mus', 'cooking pasta recipe', 'wor', 'creator', 'zzz']
+
+random.seed(1)
+words = [f'word{i}' for i in range(20000)] + [
+    'python', 'flask', 'live', 'coding', 'podcast', 'tech', 'music', 'cooking', 'pasta', 'recipe'
+]
+
+print(f"📦 Indexing {VIDEOS} videos...")
+index = SearchIndex()
+started = time.time()
+for i in range(VIDEOS):
+    index.add({
+        'id': f'v{i}',
+        'title': ' '.join(random.choices(words, k=6)),
+        'description': ' '.join(random.choices(words, k=30)),
+        'creator_name': f'creator {i % 500}'
+    })
+elapsed = time.time() - started
+print(f"   {elapsed:.1f}s total, {elapsed / VIDEOS * 1e6:.0f}µs per video")
+
+print("\n⏱️  Query latency (median of 50 runs, top 20)")
+for query in QUERIES:
+    timings = []
+    for _ in range(50):
+        started = time.perf_counter()
+        results = index.search(query, 20)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    print(f"   {query!r:24} {timings[len(timings) // 2] * 1000:7.2f} ms  ({len(results)} results)")
+
+started = time.perf_counter()
+for i in range(1000):
+    index.remove(f'v{i}')
+print(f"\n🗑️  Remove: {(time.perf_counter() - started) / 1000 * 1e6:.0f}µs per video")
@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from catalog import VideoCatalog, EngagementCounters
+from fragments import FragmentCache, join_array
+
+SIZES = [int(n) for n in os.environ.get('BENCH_SIZES', '1000,10000,100000').split(',')]
+RUNS = int(os.environ.get('BENCH_RUNS', 5))
+
+
+def build(size):
+    videos = VideoCatalog()
+    counters = EngagementCounters()
+    for i in range(size):
+        videos.add({
+            'id': f'v{i}',
+            'title': f'Video {i}',
+            'description': 'Benchmark video with a description of typical length for the listing',
+            'creator_id': f'user{i % 1000}',
+            'creator_name': f'User {i % 1000}',
+            'thumbnail': f'/api/videos/v{i}/thumbnail',
+            'video_url': f'/api/videos/v{i}/stream',
+            'duration': '03:25',
+            'views': i,
+            'created_at': '2026-01-01T00:00:00',
+            'is_live': False
+        })
+        counters.add(f'v{i}', 'likes', i % 50)
+    return videos, counters
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+print(f"⏱️  Full /api/videos body, best of {RUNS}")
+print(f"   {'videos':>8} {'json.dumps':>12} {'fragments cold':>15} {'1 changed':>12} {'unchanged':>12}")
+for size in SIZES:
+    videos, counters = build(size)
+    fragments = FragmentCache()
+
+    def before():
+        return json.dumps([{**video, **counters.get(video['id'])} for video in videos],
+                          separators=(',', ':')).encode()
+
+    def after():
+        return join_array([
+            fragments.get(video['id'], (videos.revision(video['id']), counters.revision(video['id'])),
+                          lambda: {**video, **counters.get(video['id'])})
+            for video in videos
+        ])
+
+    baseline = best_of(before)
+    started = time.perf_counter()
+    body = after()
+    cold = time.perf_counter() - started
+    assert json.loads(body) == json.loads(before())
+
+    def one_changed():
+        counters.add('v0', 'likes')
+        return after()
+
+    changed = best_of(one_changed)
+    unchanged = best_of(after)
+    print(f"   {size:>8} {baseline * 1000:>10.1f}ms {cold * 1000:>13.1f}ms "
+          f"{changed * 1000:>10.1f}ms {unchanged * 1000:>10.1f}ms")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Backend modules are flat and imported by plain name, as the apps do
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
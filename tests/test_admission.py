@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+from flask import Flask, jsonify
+
+import admission
+from admission import AdmissionControl, ConcurrencyGate, Policy, TokenBuckets
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission, 'time', clock)
+    return clock
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    buckets = TokenBuckets(rate=2, burst=3)
+    assert [buckets.take('k') for _ in range(3)] == [0, 0, 0]
+    assert buckets.take('k') == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert buckets.take('k') == 0
+    assert buckets.take('other') == 0
+
+
+def test_idle_buckets_are_pruned(clock):
+    buckets = TokenBuckets(rate=1, burst=2, max_keys=3)
+    for key in 'abc':
+        buckets.take(key)
+    clock.now += 10
+    buckets.take('d')
+    assert len(buckets) <= 3
+    buckets.take('e')
+    assert len(buckets) == 2
+
+
+def test_gate_queues_then_sheds():
+    gate = ConcurrencyGate(limit=1, max_queue=1, timeout=2)
+    assert gate.enter()
+    admitted = []
+    waiter = threading.Thread(target=lambda: admitted.append(gate.enter()))
+    waiter.start()
+    while gate.waiting == 0:
+        pass
+
+    # Queue full: shed immediately
+    assert not gate.enter()
+    gate.leave()
+    waiter.join()
+    assert admitted == [True] and gate.shed == 1
+
+
+def test_gate_times_out():
+    gate = ConcurrencyGate(limit=1, max_queue=1, timeout=0.01)
+    gate.enter()
+    assert not gate.enter()
+    assert gate.waiting == 0
+
+
+def test_policy_responses(clock):
+    app = Flask(__name__)
+    control = AdmissionControl({'post': Policy(rate=1, burst=1)})
+    control.init_app(app)
+
+    @app.route('/post', methods=['POST'])
+    def post():
+        return jsonify({'ok': True})
+
+    @app.route('/free')
+    def free():
+        return jsonify({'ok': True})
+
+    client = app.test_client()
+    assert client.post('/post', json={'username': 'alice'}).status_code == 200
+    limited = client.post('/post', json={'username': 'bob'})
+    # Same IP: the per-IP bucket is empty even for another user
+    assert limited.status_code == 429
+    assert limited.headers['Retry-After'] == '1'
+    assert all(client.get('/free').status_code == 200 for _ in range(3))
+    assert control.stats()['post']['rejected'] == 1
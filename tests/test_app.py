@@ -0,0 +1,59 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def platform(tmp_path_factory):
+    # app.py creates its folders relative to the working directory on import
+    folder = tmp_path_factory.mktemp('platform')
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(folder)
+        patch.setenv('DATA_FOLDER', str(folder / 'data'))
+        module = importlib.import_module('app')
+        yield module
+
+
+@pytest.fixture
+def client(platform):
+    return platform.app.test_client()
+
+
+def add_videos(platform, count):
+    for i in range(count):
+        platform.videos.add({'id': f'video-{i}', 'title': f'Video {i}', 'creator_id': 'alice'})
+
+
+def test_videos_are_paged(platform, client):
+    add_videos(platform, 5)
+    first = client.get('/api/videos?limit=2&fields=title').get_json()
+    assert [v['id'] for v in first['videos']] == ['video-0', 'video-1']
+    assert first['videos'][0] == {'id': 'video-0', 'title': 'Video 0'}
+
+    second = client.get(f"/api/videos?limit=2&cursor={first['next_cursor']}").get_json()
+    assert [v['id'] for v in second['videos']] == ['video-2', 'video-3']
+
+
+@pytest.mark.parametrize('limit, size', [(-1, 1), (1000, 100)])
+def test_video_page_size_is_clamped(platform, client, limit, size):
+    add_videos(platform, platform.MAX_PAGE_SIZE + 5)
+    body = client.get(f'/api/videos?limit={limit}').get_json()
+    assert len(body['videos']) == size
+    assert body['next_cursor'] is not None
+
+
+def test_invalid_video_cursor(client):
+    assert client.get('/api/videos?limit=2&cursor=abc').status_code == 400
+
+
+def test_comment_page_size_is_clamped(client):
+    for i in range(5):
+        client.post('/api/videos/commented/comments', json={'user_id': 'bob', 'text': f'comment {i}'})
+
+    body = client.get('/api/videos/commented/comments?limit=-1').get_json()
+    assert len(body['comments']) == 1
+    assert body['next_cursor'] is not None
+
+    body = client.get(f"/api/videos/commented/comments?limit=10&cursor={body['next_cursor']}").get_json()
+    assert len(body['comments']) == 4
+    assert body['next_cursor'] is None
@@ -0,0 +1,33 @@
+import threading
+
+import pytest
+
+from auth_pool import HashPool, PoolBusy
+
+
+def test_hash_and_check():
+    pool = HashPool(size=2)
+    pwhash = pool.generate_password_hash('secret')
+    assert pool.check_password_hash(pwhash, 'secret')
+    assert not pool.check_password_hash(pwhash, 'wrong')
+    assert pool.stats()['completed'] == 3
+
+
+def test_rejects_beyond_size_plus_queue():
+    pool = HashPool(size=1, max_queue=0)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait()
+
+    worker = threading.Thread(target=pool.run, args=(slow,))
+    worker.start()
+    started.wait()
+    with pytest.raises(PoolBusy):
+        pool.run(lambda: None)
+    release.set()
+    worker.join()
+    assert pool.stats()['rejected'] == 1
+    assert pool.run(lambda: 'ok') == 'ok'
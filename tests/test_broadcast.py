@@ -0,0 +1,209 @@
+import threading
+import time
+
+import pytest
+
+import broadcast
+from broadcast import AdaptiveQuality, CaptureSource, FrameEncoder, FrameSlot, ViewerStats, multipart_chunk
+
+
+class FakeDevice:
+    """Capture device producing numbered frames at most every interval seconds."""
+
+    def __init__(self, interval=0.001, fail_after=None):
+        self.interval = interval
+        self.fail_after = fail_after
+        self.frames = 0
+        self.released = False
+
+    def isOpened(self):
+        return not self.released
+
+    def grab(self):
+        time.sleep(self.interval)
+        if self.fail_after is not None and self.frames >= self.fail_after:
+            return False
+        self.frames += 1
+        return True
+
+    def retrieve(self):
+        return True, self.frames
+
+    def release(self):
+        self.released = True
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_frame_slot_wait():
+    slot = FrameSlot()
+    assert slot.wait(0, timeout=0.01) == (0, None)
+    threading.Timer(0.01, slot.publish, args=('frame',)).start()
+    assert slot.wait(0, timeout=5) == (1, 'frame')
+    assert slot.wait(0) == (1, 'frame')
+
+
+def test_one_thread_feeds_every_viewer():
+    device = FakeDevice()
+    capture = CaptureSource(lambda: device, fps=200)
+    capture.acquire()
+    seen = [[], []]
+
+    def watch(frames):
+        seq = 0
+        while len(frames) < 5:
+            seq, frame = capture.frames.wait(seq, timeout=1)
+            frames.append(seq)
+
+    viewers = [threading.Thread(target=watch, args=(frames,)) for frames in seen]
+    for viewer in viewers:
+        viewer.start()
+    for viewer in viewers:
+        viewer.join()
+    capture.release()
+
+    assert all(frames == sorted(set(frames)) for frames in seen)
+    assert wait_for(lambda: device.released)
+    assert not capture.is_open
+
+
+def test_reacquire_after_release_opens_a_new_device():
+    devices = []
+
+    def open_device():
+        devices.append(FakeDevice())
+        return devices[-1]
+
+    capture = CaptureSource(open_device, fps=200)
+    capture.acquire()
+    assert wait_for(lambda: capture.frames.seq > 0)
+    capture.release()
+    assert wait_for(lambda: devices[0].released)
+
+    capture.acquire()
+    seq = capture.frames.seq
+    assert wait_for(lambda: capture.frames.seq > seq)
+    capture.release()
+    assert len(devices) == 2
+
+
+def test_multipart_chunk():
+    assert multipart_chunk(b'JPEG') == (b'--frame\r\nContent-Type: image/jpeg\r\n'
+                                        b'Content-Length: 4\r\n\r\nJPEG\r\n')
+
+
+def test_each_frame_is_encoded_once_for_all_viewers():
+    renders = []
+
+    def render(frame):
+        renders.append(frame)
+        return f'jpeg-{frame}'.encode()
+
+    encoder = FrameEncoder(render)
+    first = encoder.chunk(1, 'a')
+    assert encoder.chunk(1, 'a') is first
+    # A viewer that lags behind gets the newest chunk, not a re-encode
+    assert encoder.chunk(1, 'stale') is first
+    assert encoder.chunk(2, 'b') == multipart_chunk(b'jpeg-b')
+    assert renders == ['a', 'b'] and encoder.encoded == 2
+
+
+def test_failed_encode_yields_no_chunk():
+    encoder = FrameEncoder(lambda frame: None)
+    assert encoder.chunk(1, 'a') is None
+
+
+def test_capture_is_paced_to_fps():
+    # The device runs far faster than fps; surplus frames are grabbed, not decoded
+    capture = CaptureSource(lambda: FakeDevice(interval=0.0005), fps=20)
+    capture.acquire()
+    time.sleep(0.5)
+    capture.release()
+    stats = capture.stats()
+    assert 7 <= stats['published'] <= 12
+    assert stats['grabbed'] > 3 * stats['published']
+
+
+def test_read_failures_are_counted():
+    capture = CaptureSource(lambda: FakeDevice(fail_after=3), fps=200)
+    capture.acquire()
+    assert wait_for(lambda: capture.stats()['read_failures'] >= 2)
+    capture.release()
+    assert capture.stats()['published'] <= 3
+
+
+def test_viewer_stats_count_skipped_frames():
+    stats = ViewerStats('480p')
+    stats.record(1, 100)
+    stats.record(2, 100)
+    stats.record(5, 100)
+    assert stats.as_dict()['sent'] == 3
+    assert stats.as_dict()['dropped'] == 2
+    assert stats.as_dict()['bytes'] == 300
+
+
+def test_encoder_tracks_subscribed_viewers():
+    encoder = FrameEncoder(lambda frame: b'x')
+    viewer = encoder.subscribe(ViewerStats('240p'))
+    assert [v['rendition'] for v in encoder.stats()['viewers']] == ['240p']
+    encoder.unsubscribe(viewer)
+    assert encoder.stats()['viewers'] == []
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleep = time.sleep
+
+    def monotonic(self):
+        return self.now
+
+
+class Viewer:
+    """Feeds an AdaptiveQuality as a viewer receiving share of 10 frames/second."""
+
+    def __init__(self, quality, clock):
+        self.quality = quality
+        self.clock = clock
+        self.seq = 0
+
+    def watch(self, seconds, share):
+        credit = 0.0
+        for _ in range(int(seconds * 10)):
+            self.clock.now += 0.1
+            self.seq += 1
+            credit += share
+            if credit >= 1:
+                credit -= 1
+                self.quality.record(self.seq, 1000)
+        return self.quality.current
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(broadcast, 'time', clock)
+    return clock
+
+
+def test_slow_viewer_steps_down_one_rung_per_window(clock):
+    viewer = Viewer(AdaptiveQuality(['240p', '360p', '480p'], window=2, upgrade_after=10), clock)
+    assert viewer.quality.current == '480p'
+    assert viewer.watch(2.1, share=0.5) == '360p'
+    assert viewer.watch(2.1, share=0.5) == '240p'
+    assert viewer.watch(4.2, share=0.5) == '240p'
+
+
+def test_steady_viewer_steps_back_up(clock):
+    viewer = Viewer(AdaptiveQuality(['240p', '360p', '480p'], window=2, upgrade_after=10), clock)
+    assert viewer.watch(2.1, share=0.5) == '360p'
+    assert viewer.watch(8, share=1) == '360p'
+    assert viewer.watch(4.2, share=1) == '480p'
+    assert viewer.quality.throughput > 0
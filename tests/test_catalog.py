@@ -0,0 +1,121 @@
+from catalog import VideoCatalog, EngagementCounters, ReactionMap, CommentStore
+
+
+def make_video(video_id, creator_id='alice', **fields):
+    return {'id': video_id, 'title': f'Video {video_id}', 'creator_id': creator_id, **fields}
+
+
+def test_lookup_by_id_and_creator():
+    videos = VideoCatalog()
+    videos.add(make_video('a'))
+    videos.add(make_video('b', creator_id='bob'))
+    videos.add(make_video('c'))
+
+    assert videos.get('b')['creator_id'] == 'bob'
+    assert videos.get('missing') is None
+    assert [v['id'] for v in videos.by_creator('alice')] == ['a', 'c']
+    assert 'c' in videos and len(videos) == 3
+
+
+def test_remove_unindexes_creator():
+    videos = VideoCatalog()
+    videos.add(make_video('a'))
+    videos.add(make_video('b', creator_id='bob'))
+
+    assert videos.remove('b')['id'] == 'b'
+    assert videos.by_creator('bob') == []
+    assert videos.remove('b') is None
+    assert [v['id'] for v in videos] == ['a']
+
+
+def test_readding_an_id_replaces_it():
+    videos = VideoCatalog()
+    videos.add(make_video('a'))
+    videos.add(make_video('a', creator_id='bob'))
+
+    assert len(videos) == 1
+    assert videos.by_creator('alice') == []
+    assert [v['id'] for v in videos.by_creator('bob')] == ['a']
+
+
+def test_counters_default_to_zero_and_drop():
+    counters = EngagementCounters()
+    assert counters.get('a') == {'likes': 0, 'dislikes': 0, 'comments_count': 0}
+
+    counters.add('a', 'comments_count')
+    counters.add('a', 'comments_count')
+    counters.add('a', 'comments_count', -1)
+    counters.add_reaction('a', 'like')
+    counters.add_reaction('a', 'unknown')
+    assert counters.get('a') == {'likes': 1, 'dislikes': 0, 'comments_count': 1}
+
+    counters.drop('a')
+    assert counters.get('a')['likes'] == 0
+
+
+def test_reaction_replace_and_retract_keep_counters_in_step():
+    counters = EngagementCounters()
+    likes = ReactionMap(counters)
+
+    assert likes.set('a', 'u1', {'type': 'like'}) is None
+    likes.set('a', 'u2', {'type': 'like'})
+    assert likes.set('a', 'u1', {'type': 'dislike'})['type'] == 'like'
+    assert counters.get('a')['likes'] == 1
+    assert counters.get('a')['dislikes'] == 1
+    assert likes.user_reaction('a', 'u1') == 'dislike'
+    assert len(likes) == 2
+
+    likes.retract('a', 'u1')
+    assert likes.retract('a', 'u1') is None
+    assert likes.user_reaction('a', 'u1') is None
+    assert counters.get('a')['dislikes'] == 0
+    assert len(likes) == 1
+
+
+def test_pages_are_stable_across_inserts_and_deletes():
+    videos = VideoCatalog()
+    for i in range(5):
+        videos.add(make_video(f'v{i}'))
+
+    page, cursor = videos.page(limit=2)
+    assert [v['id'] for v in page] == ['v0', 'v1']
+
+    # Changes behind or at the cursor don't shift the next page
+    videos.remove('v0')
+    videos.remove('v2')
+    videos.add(make_video('v5'))
+    page, cursor = videos.page(cursor, limit=2)
+    assert [v['id'] for v in page] == ['v3', 'v4']
+
+    page, cursor = videos.page(cursor, limit=2)
+    assert [v['id'] for v in page] == ['v5']
+    assert cursor is None
+
+
+def test_pages_by_creator():
+    videos = VideoCatalog()
+    for i in range(4):
+        videos.add(make_video(f'v{i}', creator_id='alice' if i % 2 else 'bob'))
+
+    page, cursor = videos.page(limit=1, creator_id='alice')
+    assert [v['id'] for v in page] == ['v1']
+    page, cursor = videos.page(cursor, limit=1, creator_id='alice')
+    assert [v['id'] for v in page] == ['v3']
+    assert cursor is None
+
+
+def test_comments_page_per_video_and_delete():
+    comments = CommentStore()
+    for i in range(5):
+        comments.add({'id': f'c{i}', 'video_id': 'a' if i < 4 else 'b', 'text': str(i)})
+
+    page, cursor = comments.page('a', limit=3)
+    assert [c['id'] for c in page] == ['c0', 'c1', 'c2']
+    comments.remove('c3')
+    assert comments.page('a', cursor, limit=3) == ([], None)
+    assert comments.count('a') == 3
+
+    assert [c['id'] for c in comments.drop_video('a')] == ['c0', 'c1', 'c2']
+    assert 'c0' not in comments
+    assert comments.page('a') == ([], None)
+    assert len(comments) == 1
@@ -0,0 +1,83 @@
+import json
+import threading
+
+from chat import ArchiveWriter, ChatRing
+
+
+def post(ring, count, start=0):
+    return [ring.append({'text': str(i)}) for i in range(start, start + count)]
+
+
+def read_archive(path):
+    with open(path) as f:
+        return [json.loads(line)['seq'] for line in f]
+
+
+def test_seq_and_since():
+    ring = ChatRing(capacity=5)
+    post(ring, 3)
+    assert ring.last_seq == 3
+
+    messages, missed = ring.since(1)
+    assert [m['seq'] for m in messages] == [2, 3] and not missed
+    assert ring.since(3) == ([], False)
+    assert [m['seq'] for m in ring.since(0, limit=2)[0]] == [1, 2]
+    assert [m['seq'] for m in ring.recent(2)] == [2, 3]
+
+
+def test_evicted_messages_are_reported_missed_and_archived(tmp_path):
+    path = str(tmp_path / 'chat' / 'stream.jsonl')
+    writer = ArchiveWriter()
+    ring = ChatRing(capacity=3, archive_path=path, writer=writer)
+    post(ring, 5)
+
+    messages, missed = ring.since(0)
+    assert [m['seq'] for m in messages] == [3, 4, 5] and missed
+    writer.flush()
+    assert read_archive(path) == [1, 2]
+
+    ring.close()
+    writer.flush()
+    assert read_archive(path) == [1, 2, 3, 4, 5]
+
+
+def test_restore_is_idempotent():
+    ring = ChatRing(capacity=5)
+    original = post(ring, 3)
+
+    replayed = ChatRing(capacity=5)
+    for message in original + original:
+        replayed.restore(dict(message))
+    assert [m['seq'] for m in replayed.since(0)[0]] == [1, 2, 3]
+    assert replayed.append({'text': 'next'})['seq'] == 4
+
+
+def test_replay_does_not_archive_twice(tmp_path):
+    path = str(tmp_path / 'stream.jsonl')
+    writer = ArchiveWriter()
+    ring = ChatRing(capacity=2, archive_path=path, writer=writer)
+    messages = post(ring, 4)
+    writer.flush()
+
+    # After a restart the journal replays every message into a fresh ring
+    replayed = ChatRing(capacity=2, archive_path=path, writer=writer)
+    for message in messages:
+        replayed.restore(dict(message))
+    writer.flush()
+    assert read_archive(path) == [1, 2]
+
+
+def test_on_append_sees_seq_order_under_concurrency():
+    ring = ChatRing(capacity=100)
+    recorded = []
+
+    def chat():
+        for i in range(200):
+            ring.append({'text': str(i)}, lambda m: recorded.append(m['seq']))
+
+    threads = [threading.Thread(target=chat) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert recorded == list(range(1, 801))
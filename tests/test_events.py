@@ -0,0 +1,64 @@
+import pytest
+
+from events import BroadcastHub, EventHubs, HubFull, format_event
+
+
+def test_format_event():
+    assert format_event(3, 'viewers', {'viewers': 2}) == b'id: 3\nevent: viewers\ndata: {"viewers": 2}\n\n'
+
+
+def test_subscriber_gets_events_after_subscribing():
+    hub = BroadcastHub()
+    hub.publish('chat', {'n': 1})
+    frames = hub.subscribe(heartbeat=0.01)
+    assert next(frames) == b'retry: 3000\n\n'
+
+    hub.publish('chat', {'n': 2})
+    assert next(frames) == format_event(2, 'chat', {'n': 2})
+    assert next(frames) == b': ping\n\n'
+    frames.close()
+    assert hub.subscribers == 0
+
+
+def test_resume_from_last_event_id():
+    hub = BroadcastHub(backlog=3)
+    for n in range(1, 4):
+        hub.publish('chat', {'n': n})
+
+    frames = hub.subscribe(last_id=1)
+    next(frames)
+    assert next(frames) == format_event(2, 'chat', {'n': 2}) + format_event(3, 'chat', {'n': 3})
+
+
+@pytest.mark.parametrize('last_id', [0, 99])
+def test_unreplayable_ids_get_resync(last_id):
+    # 0 is older than the backlog; 99 comes from before a restart
+    hub = BroadcastHub(backlog=2)
+    for n in range(1, 5):
+        hub.publish('chat', {'n': n})
+
+    frames = hub.subscribe(last_id=last_id, heartbeat=0.01)
+    next(frames)
+    assert next(frames).startswith(b'event: resync\n')
+
+
+def test_close_ends_subscriptions_and_releases_slots():
+    hub = BroadcastHub()
+    frames = hub.subscribe()
+    next(frames)
+    hub.close('end', {'reason': 'stopped'})
+    assert next(frames) == format_event(1, 'end', {'reason': 'stopped'})
+    with pytest.raises(StopIteration):
+        next(frames)
+    assert hub.subscribers == 0
+
+
+def test_subscriber_cap():
+    hubs = EventHubs(max_subscribers=1)
+    first = hubs.get('s').subscribe()
+    with pytest.raises(HubFull):
+        hubs.get('s').subscribe()
+    # Unstarted subscriptions hold their slot until closed too
+    first.close()
+    hubs.get('s').subscribe().close()
+    assert hubs.stats() == {'streams': 1, 'subscribers': 0}
@@ -0,0 +1,33 @@
+import json
+
+from fragments import FragmentCache, encode, join_array
+
+
+def test_join_array_is_valid_json():
+    assert json.loads(join_array([encode({'a': 1}), encode([2])])) == [{'a': 1}, [2]]
+    assert join_array([]) == b'[]'
+
+
+def test_fragments_reencode_only_when_stamp_changes():
+    cache = FragmentCache()
+    video = {'id': 'a', 'views': 1}
+    assert cache.get('a', 1, lambda: video) == b'{"id":"a","views":1}'
+
+    video['views'] = 2
+    assert cache.get('a', 1, lambda: video) == b'{"id":"a","views":1}'
+    assert cache.get('a', 2, lambda: video) == b'{"id":"a","views":2}'
+    assert cache.stats()['encoded'] == 2
+
+
+def test_variants_are_cached_separately_and_bounded():
+    cache = FragmentCache(max_variants=2)
+    cache.get('a', 1, lambda: {'id': 'a'}, variant=('id',))
+    cache.get('a', 1, lambda: {'id': 'a', 'title': 't'}, variant=('id', 'title'))
+    assert cache.get('a', 1, lambda: {}, variant=('id',)) == b'{"id":"a"}'
+
+    cache.get('a', 1, lambda: {'title': 't'}, variant=('title',))
+    assert cache.stats()['items'] == 1
+    assert cache.stats()['encoded'] == 3
+
+    cache.discard('a')
+    assert cache.stats()['items'] == 0
@@ -0,0 +1,68 @@
+import os
+
+from journal import Journal
+
+
+def test_ops_replay_in_order(tmp_path):
+    journal = Journal(str(tmp_path))
+    journal.load()
+    journal.start(lambda: {})
+    journal.record('add', 1)
+    journal.record('add', 2)
+    journal.flush()
+
+    state, ops = Journal(str(tmp_path)).load()
+    assert state is None
+    assert list(ops) == [('add', [1]), ('add', [2])]
+
+
+def test_snapshot_compacts_older_segments(tmp_path):
+    items = []
+    journal = Journal(str(tmp_path))
+    journal.load()
+    journal.start(lambda: {'items': list(items)})
+    for i in range(3):
+        items.append(i)
+        journal.record('add', i)
+    journal.flush()
+    journal.snapshot()
+    journal.record('add', 3)
+    journal.flush()
+
+    state, ops = Journal(str(tmp_path)).load()
+    assert state == {'items': [0, 1, 2]}
+    assert list(ops) == [('add', [3])]
+    assert len([n for n in os.listdir(tmp_path) if n.startswith('journal-')]) == 1
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    journal = Journal(str(tmp_path))
+    journal.load()
+    journal.start(lambda: {})
+    journal.record('add', 1)
+    journal.flush()
+    with open(journal._segment_path(journal._gen), 'a') as f:
+        f.write('["add", [2')
+
+    _, ops = Journal(str(tmp_path)).load()
+    assert list(ops) == [('add', [1])]
+
+
+def test_ops_after_torn_tail_survive_restart(tmp_path):
+    journal = Journal(str(tmp_path))
+    journal.load()
+    journal.start(lambda: {})
+    journal.record('add', 1)
+    journal.flush()
+    with open(journal._segment_path(journal._gen), 'a') as f:
+        f.write('["add", [2')
+
+    restarted = Journal(str(tmp_path))
+    _, ops = restarted.load()
+    assert list(ops) == [('add', [1])]
+    restarted.start(lambda: {})
+    restarted.record('add', 3)
+    restarted.flush()
+
+    _, ops = Journal(str(tmp_path)).load()
+    assert list(ops) == [('add', [1]), ('add', [3])]
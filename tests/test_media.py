@@ -0,0 +1,100 @@
+import pytest
+from flask import Flask
+from werkzeug.wsgi import FileWrapper
+
+from media import RangeNotSatisfiable, parse_range, send_video_file, starts_playback
+
+app = Flask(__name__)
+DATA = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = tmp_path / 'clip.mp4'
+    path.write_bytes(DATA)
+    return str(path)
+
+
+def serve(path, headers=None, file_wrapper=True):
+    environ = {'wsgi.file_wrapper': FileWrapper} if file_wrapper else {}
+    with app.test_request_context(headers=headers or {}, environ_overrides=environ):
+        response = send_video_file(path)
+        body = b''.join(response.response)
+        response.close()
+    return response, body
+
+
+def test_parse_range_forms():
+    assert parse_range(None, 100) is None
+    assert parse_range('items=0-1', 100) is None
+    assert parse_range('bytes=0-9', 100) == (0, 9)
+    assert parse_range('bytes=90-', 100) == (90, 99)
+    assert parse_range('bytes=-10', 100) == (90, 99)
+    assert parse_range('bytes=-500', 100) == (0, 99)
+    assert parse_range('bytes=50-500', 100) == (50, 99)
+
+
+@pytest.mark.parametrize('header', ['bytes=100-', 'bytes=5-1', 'bytes=0-1,5-6', 'bytes=a-b', 'bytes=-0', 'bytes=5'])
+def test_parse_range_rejects(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 100)
+
+
+def test_starts_playback():
+    assert starts_playback(None)
+    assert starts_playback('bytes=0-')
+    assert not starts_playback('bytes=1000-')
+
+
+def test_full_response(video_path):
+    response, body = serve(video_path)
+    assert response.status_code == 200
+    assert body == DATA
+    assert response.headers['Accept-Ranges'] == 'bytes'
+
+
+@pytest.mark.parametrize('file_wrapper', [True, False])
+def test_range_stops_at_end(video_path, file_wrapper):
+    # Servers that send a wrapped file to EOF must not get one for a range
+    response, body = serve(video_path, {'Range': 'bytes=10-19'}, file_wrapper)
+    assert response.status_code == 206
+    assert body == DATA[10:20]
+    assert response.headers['Content-Range'] == f'bytes 10-19/{len(DATA)}'
+    assert response.headers['Content-Length'] == '10'
+
+
+@pytest.mark.parametrize('header', [None, 'bytes=0-', 'bytes=10-', 'bytes=-10'])
+def test_ranges_to_end_of_file_use_file_wrapper(video_path, header):
+    response, body = serve(video_path, {'Range': header} if header else None)
+    assert isinstance(response.response, FileWrapper)
+    start = len(DATA) - len(body)
+    assert body == DATA[start:]
+    assert response.headers['Content-Length'] == str(len(body))
+
+
+def test_range_before_end_of_file_is_not_wrapped(video_path):
+    response, _ = serve(video_path, {'Range': f'bytes=0-{len(DATA) - 2}'})
+    assert not isinstance(response.response, FileWrapper)
+
+
+def test_unsatisfiable_range(video_path):
+    response, _ = serve(video_path, {'Range': f'bytes={len(DATA)}-'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(DATA)}'
+
+
+def test_if_none_match_applies_with_range(video_path):
+    etag = serve(video_path)[0].headers['ETag']
+    assert serve(video_path, {'If-None-Match': etag})[0].status_code == 304
+    assert serve(video_path, {'If-None-Match': etag, 'Range': 'bytes=0-9'})[0].status_code == 304
+
+
+def test_stale_if_range_sends_whole_file(video_path):
+    response, body = serve(video_path, {'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert response.status_code == 200
+    assert body == DATA
+
+    etag = response.headers['ETag']
+    response, body = serve(video_path, {'Range': 'bytes=0-9', 'If-Range': etag})
+    assert response.status_code == 206
+    assert body == DATA[:10]
@@ -0,0 +1,69 @@
+import pytest
+
+import presence
+from presence import PresenceTracker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(presence, 'time', clock)
+    return clock
+
+
+def test_viewers_expire_after_ttl(clock):
+    tracker = PresenceTracker(ttl=3)
+    tracker.open('s')
+    tracker.heartbeat('s', 'a')
+    tracker.heartbeat('s', 'b')
+    assert tracker.expire() == {'s': {'viewers': 2, 'peak_viewers': 2}}
+
+    clock.now += 2
+    tracker.heartbeat('s', 'a')
+    assert tracker.expire() == {}
+
+    clock.now += 2
+    assert tracker.expire() == {'s': {'viewers': 1, 'peak_viewers': 2}}
+    clock.now += 2
+    assert tracker.expire() == {'s': {'viewers': 0, 'peak_viewers': 2}}
+
+
+def test_expiry_catches_up_after_a_stall(clock):
+    tracker = PresenceTracker(ttl=3)
+    tracker.open('s')
+    tracker.heartbeat('s', 'a')
+    clock.now += 100
+    tracker.expire()
+    assert tracker.counts('s')['viewers'] == 0
+
+
+def test_leave_and_drop(clock):
+    tracker = PresenceTracker(ttl=3)
+    tracker.open('s')
+    tracker.heartbeat('s', 'a')
+    tracker.heartbeat('s', 'b')
+    tracker.leave('s', 'a')
+    tracker.heartbeat('s', 'a')
+    assert tracker.counts('s') == {'viewers': 2, 'peak_viewers': 2}
+
+    assert tracker.drop('s') == {'viewers': 2, 'peak_viewers': 2, 'joins': 3}
+    assert tracker.stats() == {'streams': 0, 'viewers': 0}
+    clock.now += 10
+    assert tracker.expire() == {}
+
+
+def test_heartbeats_for_unopened_or_dropped_streams_are_ignored(clock):
+    tracker = PresenceTracker(ttl=3)
+    assert tracker.heartbeat('s', 'a') is None
+    tracker.open('s')
+    tracker.drop('s')
+    assert tracker.heartbeat('s', 'a') is None
+    assert tracker.stats() == {'streams': 0, 'viewers': 0}
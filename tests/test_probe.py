@@ -0,0 +1,83 @@
+import struct
+
+import pytest
+
+from probe import ProbeError, format_duration, probe_file
+
+UNKNOWN = None
+
+
+def box(box_type, payload=b''):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def mp4(duration=90, timescale=1000, width=1280, height=720, moov_last=False):
+    mvhd = box(b'mvhd', bytes(12) + struct.pack('>II', timescale, duration * timescale) + bytes(80))
+    tkhd = box(b'tkhd', bytes(76) + struct.pack('>II', width << 16, height << 16))
+    audio = box(b'tkhd', bytes(76) + struct.pack('>II', 0, 0))
+    moov = box(b'moov', mvhd + box(b'trak', tkhd) + box(b'trak', audio))
+    head = box(b'ftyp', b'isom' + bytes(4))
+    mdat = box(b'mdat', bytes(1000))
+    return head + (mdat + moov if moov_last else moov + mdat)
+
+
+def element(element_id, payload=b'', size=len):
+    encoded_id = element_id.to_bytes((element_id.bit_length() + 7) // 8, 'big')
+    if size is UNKNOWN:
+        encoded_size = b'\x01' + b'\xff' * 7
+    else:
+        encoded_size = (0x4000 | len(payload)).to_bytes(2, 'big')
+    return encoded_id + encoded_size + payload
+
+
+def webm(unknown_sizes=False):
+    size = UNKNOWN if unknown_sizes else len
+    info = element(0x1549A966, element(0x2AD7B1, (1000000).to_bytes(3, 'big')) +
+                   element(0x4489, struct.pack('>d', 62500.0)))
+    video = element(0xE0, element(0xB0, (640).to_bytes(2, 'big')) + element(0xBA, (360).to_bytes(2, 'big')), size)
+    tracks = element(0x1654AE6B, element(0xAE, element(0xD7, b'\x01') + video, size), size)
+    cluster = element(0x1F43B675, element(0xE7, b'\x00') + bytes(64), size)
+    return element(0x1A45DFA3, element(0x4282, b'webm')) + element(0x18538067, tracks + info + cluster, size)
+
+
+def write(tmp_path, data, name='clip'):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_format_duration():
+    assert format_duration(5) == '0:05'
+    assert format_duration(62.6) == '1:03'
+    assert format_duration(3725) == '1:02:05'
+
+
+@pytest.mark.parametrize('moov_last', [False, True])
+def test_mp4(tmp_path, moov_last):
+    data = mp4(moov_last=moov_last)
+    info = probe_file(write(tmp_path, data))
+    assert info['duration_seconds'] == 90
+    assert info['duration'] == '1:30'
+    assert (info['width'], info['height']) == (1280, 720)
+    assert info['bitrate'] == int(len(data) * 8 / 90)
+
+
+@pytest.mark.parametrize('unknown_sizes', [False, True])
+def test_webm(tmp_path, unknown_sizes):
+    info = probe_file(write(tmp_path, webm(unknown_sizes)))
+    assert info['duration_seconds'] == 62.5
+    assert (info['width'], info['height']) == (640, 360)
+
+
+def test_unknown_size_leaf_is_rejected(tmp_path):
+    bad = element(0x1A45DFA3, element(0x4282, b'webm')) + element(
+        0x18538067, element(0x1549A966, element(0x4489, b'', UNKNOWN)))
+    with pytest.raises(ProbeError):
+        probe_file(write(tmp_path, bad))
+
+
+def test_unsupported_and_truncated(tmp_path):
+    with pytest.raises(ProbeError):
+        probe_file(write(tmp_path, b'not a video file'))
+    with pytest.raises(ProbeError):
+        probe_file(write(tmp_path, box(b'ftyp', b'isom') + box(b'mdat', bytes(16))))
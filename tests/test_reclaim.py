@@ -0,0 +1,65 @@
+import os
+import time
+
+import reclaim
+from reclaim import FileReclaimer
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_files_are_deleted_in_the_background(tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'x' * 100)
+    reclaimer = FileReclaimer()
+    reclaimer.submit(str(path))
+
+    assert wait_for(lambda: not path.exists())
+    assert wait_for(lambda: reclaimer.stats()['reclaimed_bytes'] == 100)
+    assert reclaimer.stats()['pending_files'] == 0
+
+
+def test_missing_files_and_empty_paths_are_ignored(tmp_path):
+    reclaimer = FileReclaimer()
+    reclaimer.submit(None)
+    reclaimer.submit(str(tmp_path / 'gone.mp4'), size=10)
+    assert wait_for(lambda: reclaimer.stats()['pending_bytes'] == 0)
+    assert reclaimer.stats()['failed'] == 0
+
+
+def test_failures_are_retried_then_given_up(tmp_path):
+    # A directory can't be removed with os.remove, so every attempt fails
+    path = tmp_path / 'stuck'
+    path.mkdir()
+    reclaimer = FileReclaimer(max_attempts=3, base_delay=0.01, max_delay=0.02)
+    reclaimer.submit(str(path), size=5)
+
+    assert wait_for(lambda: reclaimer.stats()['failed'] == 1)
+    assert os.path.isdir(path)
+    assert reclaimer.stats()['pending_bytes'] == 0
+
+
+def test_unlink_goes_through_tpool_when_monkey_patched(tmp_path, monkeypatch):
+    calls = []
+
+    class Tpool:
+        @staticmethod
+        def execute(fn, *args):
+            calls.append(args)
+            return fn(*args)
+
+    monkeypatch.setattr(reclaim, 'tpool', Tpool)
+    monkeypatch.setattr(reclaim, '_monkey_patched', lambda: True)
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(b'x')
+    reclaimer = FileReclaimer()
+    reclaimer.submit(str(path))
+
+    assert wait_for(lambda: not path.exists())
+    assert calls == [(str(path),)]
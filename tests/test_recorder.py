@@ -0,0 +1,138 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+import recorder
+from recorder import Recorder
+
+
+def frame(i, size=(160, 120)):
+    return np.full((size[1], size[0], 3), i % 256, np.uint8)
+
+
+def record(folder, frames, interval=0.1, **options):
+    results = []
+    rec = Recorder(str(folder), 'stream', fps=10, on_finished=lambda path, info: results.append((path, info)),
+                   **options)
+    for i in range(frames):
+        rec.offer(frame(i), 100 + i * interval)
+    rec.stop()
+    rec.join(30)
+    assert len(results) == 1
+    return rec, results[0]
+
+
+def frame_count(path):
+    video = cv2.VideoCapture(path)
+    try:
+        return int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        video.release()
+
+
+def test_single_segment_is_finalized_in_place(tmp_path):
+    rec, (path, info) = record(tmp_path, 5, max_queue=100)
+    assert rec.status == 'ready'
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    assert frame_count(path) == 5
+    assert info['written'] == 5 and info['segments'] == 1
+
+
+def test_segments_are_joined_into_one_file(tmp_path):
+    rec, (path, info) = record(tmp_path, 25, max_queue=100, segment_seconds=1)
+    assert info['segments'] == 3
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    assert frame_count(path) == 25
+    assert info['seconds'] == 2.5
+
+
+def test_nothing_recorded(tmp_path):
+    rec, (path, info) = record(tmp_path, 0)
+    assert path is None and rec.status == 'failed'
+    assert os.listdir(tmp_path) == []
+
+
+def test_frames_of_another_size_are_scaled(tmp_path):
+    results = []
+    rec = Recorder(str(tmp_path), 'stream', fps=10, max_queue=100,
+                   on_finished=lambda path, info: results.append(path))
+    rec.offer(frame(0), 0)
+    rec.offer(frame(1, size=(320, 240)), 0.1)
+    rec.stop()
+    rec.join(30)
+    assert frame_count(results[0]) == 2
+
+
+def test_an_error_while_recording_still_finalizes(tmp_path):
+    results = []
+    rec = Recorder(str(tmp_path), 'stream', fps=10, max_queue=100,
+                   on_finished=lambda path, info: results.append(path))
+    rec.offer(frame(0), 0)
+    rec.offer('not a frame', 0.1)
+    rec.join(30)
+    assert rec.status == 'ready'
+    assert frame_count(results[0]) == 1
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path, monkeypatch):
+    unblock = threading.Event()
+    real_open_writer = recorder.open_writer
+
+    class SlowWriter:
+        def __init__(self, writer):
+            self.writer = writer
+
+        def write(self, image):
+            unblock.wait()
+            self.writer.write(image)
+
+        def release(self):
+            self.writer.release()
+
+    def open_writer(*args):
+        writer, codec, path = real_open_writer(*args)
+        return SlowWriter(writer), codec, path
+
+    monkeypatch.setattr(recorder, 'open_writer', open_writer)
+    rec = Recorder(str(tmp_path), 'stream', fps=10, max_queue=2)
+    for i in range(10):
+        rec.offer(frame(i), i / 10)
+    assert rec.dropped >= 7
+    unblock.set()
+    rec.stop()
+    rec.join(30)
+    assert rec.written + rec.dropped == 10
+
+
+def test_slow_camera_repeats_frames_to_keep_wall_clock_time(tmp_path):
+    rec, (path, info) = record(tmp_path, 10, interval=0.2, max_queue=100)
+    assert frame_count(path) == 19
+    assert info['repeated'] == 9
+    assert info['seconds'] == 1.9
+
+
+def test_frames_faster_than_fps_are_skipped(tmp_path):
+    rec, (path, info) = record(tmp_path, 20, interval=0.04, max_queue=100)
+    assert frame_count(path) == 9
+    assert info['skipped'] == 11
+    assert info['seconds'] == 0.9
+
+
+def test_codec_without_browser_support_is_reported(tmp_path, monkeypatch):
+    monkeypatch.setattr(recorder, 'CODECS', (('mp4v', '.mp4', False),))
+    rec, (path, info) = record(tmp_path, 3)
+    assert path.endswith('.mp4')
+    assert info['codec'] == 'mp4v' and not info['browser_playable']
+
+
+@pytest.mark.parametrize('codec', recorder.CODECS, ids=lambda codec: codec[0])
+def test_open_writer_falls_through_unavailable_codecs(tmp_path, codec):
+    base = str(tmp_path / 'probe')
+    writer, chosen, path = recorder.open_writer(base, 10, (160, 120), (('XXXX', '.mp4', True), codec))
+    if writer is None:
+        pytest.skip(f'{codec[0]} encoder not available')
+    writer.release()
+    assert chosen == codec and path == base + codec[1]
@@ -0,0 +1,80 @@
+import gzip
+import json
+
+from flask import Flask
+
+from response_cache import ResponseCache
+
+app = Flask(__name__)
+
+
+def respond(cache, key, version, render, headers=None):
+    with app.test_request_context(headers=headers or {}):
+        return cache.respond(key, version, render)
+
+
+def test_renders_once_per_version():
+    cache = ResponseCache()
+    renders = []
+
+    def render():
+        renders.append(1)
+        return {'n': len(renders)}
+
+    assert cache.lookup('k', 1, render).encodings['identity'] == b'{"n":1}'
+    cache.lookup('k', 1, render)
+    assert len(renders) == 1
+    cache.lookup('k', 2, render)
+    assert len(renders) == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_named_versions():
+    cache = ResponseCache()
+    assert cache.version('live') == 0
+    cache.bump('live')
+    cache.bump('live')
+    assert cache.version('live') == 2
+
+
+def test_etag_and_304():
+    cache = ResponseCache()
+    response = respond(cache, 'k', 1, lambda: {'a': 1})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    assert respond(cache, 'k', 1, lambda: {'a': 1}, {'If-None-Match': etag}).status_code == 304
+    assert respond(cache, 'k', 2, lambda: {'a': 2}, {'If-None-Match': etag}).status_code == 200
+
+
+def test_large_bodies_are_served_compressed():
+    cache = ResponseCache()
+    body = [{'title': f'Video {i}'} for i in range(200)]
+    response = respond(cache, 'k', 1, lambda: body, {'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.get_data())) == body
+
+    small = respond(cache, 's', 1, lambda: {'a': 1}, {'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+def test_lru_bound():
+    cache = ResponseCache(max_entries=2)
+    for key in 'abc':
+        cache.lookup(key, 1, lambda: {})
+    assert cache.stats()['entries'] == 2
+
+
+def test_each_encoding_has_its_own_etag():
+    cache = ResponseCache()
+    body = [{'title': f'Video {i}'} for i in range(200)]
+    identity = respond(cache, 'k', 1, lambda: body).headers['ETag']
+    gzipped = respond(cache, 'k', 1, lambda: body, {'Accept-Encoding': 'gzip'}).headers['ETag']
+    assert identity != gzipped
+
+    # A gzip validator must not revalidate an identity body, or the reverse
+    assert respond(cache, 'k', 1, lambda: body, {'If-None-Match': gzipped}).status_code == 200
+    assert respond(cache, 'k', 1, lambda: body,
+                   {'Accept-Encoding': 'gzip', 'If-None-Match': identity}).status_code == 200
+    assert respond(cache, 'k', 1, lambda: body,
+                   {'Accept-Encoding': 'gzip', 'If-None-Match': gzipped}).status_code == 304
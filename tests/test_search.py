@@ -0,0 +1,60 @@
+from search import SearchIndex, tokenize
+
+
+def video(video_id, title, description='', creator_name='someone'):
+    return {'id': video_id, 'title': title, 'description': description, 'creator_name': creator_name}
+
+
+def ids(results):
+    return [video_id for video_id, _ in results]
+
+
+def build():
+    index = SearchIndex()
+    index.add(video('cats', 'Funny cats compilation', 'Cats doing cat things'))
+    index.add(video('dogs', 'Dog training basics', 'A video that mentions cats once'))
+    index.add(video('cook', 'Cooking pasta', 'Dinner recipes', creator_name='Cat Chef'))
+    index.add(video('guitar', 'Guitar lesson', 'Learn chords'))
+    return index
+
+
+def test_tokenize():
+    assert tokenize('Hello, World! 2x') == ['hello', 'world', '2x']
+    assert tokenize(None) == []
+
+
+def test_title_matches_rank_above_description_matches():
+    assert ids(build().search('cats')) == ['cats', 'dogs']
+
+
+def test_rare_terms_outweigh_common_ones():
+    index = build()
+    index.add(video('more', 'Cats and guitar', ''))
+    # "lesson" appears once, "cats" everywhere: the guitar lesson wins
+    assert ids(index.search('cats lesson'))[0] == 'guitar'
+
+
+def test_last_token_matches_as_prefix():
+    index = build()
+    assert ids(index.search('guit')) == ['guitar']
+    assert set(ids(index.search('ca'))) == {'cats', 'dogs', 'cook'}
+    assert index.search('') == []
+    assert index.search('zebra') == []
+
+
+def test_remove_and_replace():
+    index = build()
+    index.remove('cats')
+    assert 'cats' not in ids(index.search('cats'))
+
+    index.add(video('guitar', 'Drum lesson', ''))
+    assert index.search('guitar') == []
+    assert ids(index.search('drum')) == ['guitar']
+    assert len(index) == 3
+
+
+def test_suggest_completes_last_word():
+    index = build()
+    assert index.suggest('funny ca')[0].startswith('funny ca')
+    assert 'guitar' in index.suggest('gu')
+    assert index.suggest('') == []
@@ -0,0 +1,36 @@
+import hashlib
+
+from thumbnails import ThumbnailCache
+
+
+def test_put_is_content_addressed(tmp_path):
+    cache = ThumbnailCache(str(tmp_path))
+    digest = cache.put(b'jpeg bytes', 'jpg')
+    assert digest == hashlib.sha256(b'jpeg bytes').hexdigest()
+    assert cache.put(b'jpeg bytes', 'jpg') == digest
+    assert (tmp_path / digest[:2] / f'{digest}.jpg').read_bytes() == b'jpeg bytes'
+
+
+def test_memory_hits_keep_formats_apart(tmp_path):
+    cache = ThumbnailCache(str(tmp_path))
+    digest = cache.put(b'jpeg bytes', 'jpg')
+    # A webp stored under the same name must not be answered from the jpg entry
+    (tmp_path / digest[:2] / f'{digest}.webp').write_bytes(b'webp bytes')
+
+    assert cache.get(digest, 'jpg') == b'jpeg bytes'
+    assert cache.get(digest, 'webp') == b'webp bytes'
+    assert cache.get(digest, 'jpg') == b'jpeg bytes'
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    cache = ThumbnailCache(str(tmp_path), memory_bytes=20)
+    first = cache.put(b'a' * 10, 'jpg')
+    second = cache.put(b'b' * 10, 'jpg')
+    cache.get(first, 'jpg')
+    cache.put(b'c' * 10, 'jpg')
+
+    assert (first, 'jpg') in cache._memory
+    assert (second, 'jpg') not in cache._memory
+    # Evicted entries are still served from disk
+    assert cache.get(second, 'jpg') == b'b' * 10
+    assert cache.get('0' * 64, 'jpg') is None
@@ -0,0 +1,97 @@
+import io
+import json
+import hashlib
+
+import pytest
+
+from uploads import UploadSessions, UploadError, SESSION_SUFFIX
+
+
+def put(sessions, session, offset, data, checksum=None):
+    return sessions.write_chunk(session['id'], offset, io.BytesIO(data), len(data), checksum)
+
+
+def test_chunks_resume_at_offset(tmp_path):
+    sessions = UploadSessions(str(tmp_path), max_size=100)
+    session = sessions.create('clip.mp4', 10)
+
+    assert put(sessions, session, 0, b'hello') == 5
+    with pytest.raises(UploadError) as error:
+        put(sessions, session, 0, b'hello')
+    assert error.value.status == 409 and error.value.offset == 5
+
+    with pytest.raises(UploadError) as error:
+        put(sessions, session, 5, b'world', checksum=hashlib.sha256(b'other').hexdigest())
+    assert error.value.status == 422
+    assert sessions.get(session['id'])['offset'] == 5
+
+    assert put(sessions, session, 5, b'world', checksum=hashlib.sha256(b'world').hexdigest()) == 10
+    finished = sessions.finish(session['id'])
+    with open(finished['filepath'], 'rb') as f:
+        assert f.read() == b'helloworld'
+
+
+def test_only_one_concurrent_finish_succeeds(tmp_path):
+    sessions = UploadSessions(str(tmp_path), max_size=100)
+    session = sessions.create('clip.mp4', 5)
+    put(sessions, session, 0, b'hello')
+    # The second complete looked the session up before the first removed it
+    stale = sessions.get(session['id'])
+    sessions.finish(session['id'])
+    sessions.get = lambda upload_id: stale
+    with pytest.raises(UploadError) as error:
+        sessions.finish(session['id'])
+    assert error.value.status == 404
+
+
+def test_limits(tmp_path):
+    sessions = UploadSessions(str(tmp_path), max_size=100)
+    with pytest.raises(UploadError) as error:
+        sessions.create('big.mp4', 101)
+    assert error.value.status == 413
+
+    session = sessions.create('clip.mp4', 4)
+    with pytest.raises(UploadError) as error:
+        put(sessions, session, 0, b'12345')
+    assert error.value.status == 413
+    with pytest.raises(UploadError) as error:
+        sessions.finish(session['id'])
+    assert error.value.status == 409
+
+
+def test_sessions_survive_a_restart(tmp_path):
+    sessions = UploadSessions(str(tmp_path), max_size=100)
+    session = sessions.create('clip.mp4', 10, {'title': 'Clip'})
+    put(sessions, session, 0, b'hello')
+
+    restarted = UploadSessions(str(tmp_path), max_size=100)
+    resumed = restarted.get(session['id'])
+    assert resumed['offset'] == 5 and resumed['metadata'] == {'title': 'Clip'}
+    assert put(restarted, resumed, 5, b'world') == 10
+    restarted.finish(session['id'])
+    assert not list(tmp_path.glob('*' + SESSION_SUFFIX))
+
+
+def test_stale_partials_are_swept_on_load(tmp_path):
+    sessions = UploadSessions(str(tmp_path), max_size=100, ttl=60)
+    session = sessions.create('clip.mp4', 10)
+    sidecar = session['filepath'] + SESSION_SUFFIX
+    with open(sidecar) as f:
+        saved = json.load(f)
+    saved['updated_at'] -= 3600
+    with open(sidecar, 'w') as f:
+        json.dump(saved, f)
+
+    restarted = UploadSessions(str(tmp_path), max_size=100, ttl=60)
+    with pytest.raises(UploadError):
+        restarted.get(session['id'])
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_abort_discards_partial(tmp_path):
+    sessions = UploadSessions(str(tmp_path), max_size=100)
+    session = sessions.create('clip.mp4', 10)
+    sessions.abort(session['id'])
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(UploadError):
+        sessions.abort(session['id'])
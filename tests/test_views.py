@@ -0,0 +1,57 @@
+import threading
+
+from views import RotatingBloomFilter, ViewCounter
+
+
+def test_bloom_filter_remembers_for_two_generations():
+    bloom = RotatingBloomFilter(1000)
+    assert not bloom.check_and_add('a')
+    assert bloom.check_and_add('a')
+    bloom.rotate()
+    assert bloom.check_and_add('a')
+    bloom.rotate()
+    bloom.rotate()
+    assert not bloom.check_and_add('a')
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = RotatingBloomFilter(10000, error_rate=0.01)
+    for i in range(10000):
+        bloom.check_and_add(f'seen-{i}')
+    # Probing adds too, so keep the sample small against the capacity
+    false_positives = sum(bloom.check_and_add(f'new-{i}') for i in range(1000))
+    assert false_positives < 30
+
+
+def test_views_are_deduplicated_and_merged_on_flush():
+    flushed = []
+    views = ViewCounter(flushed.append, stripes=4, capacity=10000)
+    assert views.record('a', 'client1')
+    assert not views.record('a', 'client1')
+    assert views.record('a', 'client2')
+    assert views.record('b', 'client1')
+    assert views.pending('a') == 2
+
+    views.flush()
+    assert flushed == [{'a': 2, 'b': 1}]
+    assert views.pending('a') == 0
+    views.flush()
+    assert len(flushed) == 1
+
+
+def test_concurrent_records_are_all_counted():
+    flushed = []
+    views = ViewCounter(flushed.append, stripes=4, capacity=100000)
+
+    def watch(thread_id):
+        for i in range(500):
+            views.record('a', f'{thread_id}-{i}')
+
+    threads = [threading.Thread(target=watch, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    views.flush()
+    assert flushed[0]['a'] + views.deduplicated == 4000
+    assert views.deduplicated < 40